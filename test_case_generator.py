@@ -1,592 +1,3309 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
 import random
 import string
+import os
+import shutil
 import sys
-import time 
+import threading
+import time
+import argparse
+import bisect
+import collections
+import contextlib
+import functools
+import hashlib
+import importlib
+import importlib.util
+import io
+import itertools
+import json
+import math
+import mmap
+import re
+import shlex
+from dataclasses import dataclass, replace
 
-class TestCaseGeneratorApp(tk.Tk):
+# Headless runs start in a few milliseconds: the GUI (tkinter) lives in
+# test_case_generator_gui, and concurrent.futures, subprocess, gzip and zipfile
+# are imported by the functions that need them.
 
-    def __init__(self):
-        super().__init__()
-        self.title("Codeforces Test Case Generator")
-        self.geometry("900x800")
-        self.minsize(750, 650)
-
-        self.style = ttk.Style(self)
-        available_themes = self.style.theme_names()
-        if 'clam' in available_themes:
-            self.style.theme_use('clam')
-        elif 'alt' in available_themes:
-             self.style.theme_use('alt')
-        elif 'vista' in available_themes: # Good for Windows
-             self.style.theme_use('vista')
-        elif 'aqua' in available_themes: # Good for macOS
-             self.style.theme_use('aqua')
-        # Default theme as fallback
-
-        # Define custom colors (adapt these for better themes)
-        self.bg_color = self.style.lookup('TFrame', 'background') # Get theme background
-        self.fg_color = self.style.lookup('TLabel', 'foreground') # Get theme foreground
-        self.accent_color = "#0078D7" # A blue accent color
-        self.accent_fg_color = "#FFFFFF" # White text on accent
-        self.hover_color = "#005A9E" # Darker blue for hover
-        self.pressed_color = "#003C6A" # Even darker for pressed
-        self.disabled_bg_color = "#F0F0F0" # Lighter grey for disabled
-        self.disabled_fg_color = "#A0A0A0" # Grey text for disabled
-        self.status_success_color = "#107C10" # Green for success
-        self.status_warning_color = "#D83B01" # Orange for warning
-        self.status_info_color = self.fg_color # Default text color for info
-
-        # --- Custom Styles ---
-        self.style.configure('TLabelFrame', padding=10, borderwidth=1, relief="groove")
-        self.style.configure('TFrame', background=self.bg_color)
-        self.style.configure('TCheckbutton', padding=5)
-        self.style.configure('TRadiobutton', padding=(0, 5), background=self.bg_color) # Match background
-        self.style.configure('TEntry', padding=5)
-        self.style.configure('TCombobox', padding=5)
-
-        # Custom Button Style (Primary Action)
-        self.style.configure('Accent.TButton',
-                             font=('Segoe UI', 10, 'bold'), # Slightly more modern font if available
-                             padding=(15, 8),
-                             background=self.accent_color,
-                             foreground=self.accent_fg_color,
-                             borderwidth=1,
-                             relief="raised") # Start raised
-        self.style.map('Accent.TButton',
-                       background=[('active', self.pressed_color), # Clicked state
-                                   ('hover', self.hover_color),   # Hover state
-                                   ('disabled', self.disabled_bg_color)],
-                       foreground=[('disabled', self.disabled_fg_color)],
-                       relief=[('pressed', 'sunken'), # Sunken when pressed
-                               ('!pressed', 'raised')]) # Raised otherwise
-
-        # Standard Button Style
-        self.style.configure('Std.TButton',
-                             font=('Segoe UI', 9),
-                             padding=(10, 5),
-                             borderwidth=1,
-                             relief="raised")
-        self.style.map('Std.TButton',
-                        background=[('active', self.style.lookup('TButton', 'selectbackground')),
-                                    ('hover', self.style.lookup('TButton', 'lightcolor'))], # Use theme's hover if possible
-                        relief=[('pressed', 'sunken'),
-                                ('!pressed', 'raised')])
-
-        # --- Main Frame ---
-        main_frame = ttk.Frame(self, padding="15") # Increased padding
-        main_frame.pack(fill=tk.BOTH, expand=True)
-        main_frame.grid_columnconfigure(0, weight=1, minsize=350) # Config column (flexible width)
-        main_frame.grid_columnconfigure(1, weight=2) # Output column (takes more space)
-        main_frame.grid_rowconfigure(0, weight=1)    # Allow row to expand vertically
-        main_frame.grid_rowconfigure(1, weight=0)    # Status bar row (fixed height)
-
-        # --- Configuration Frame (Left Side) with Scrollbar ---
-        config_scroll_frame = ttk.Frame(main_frame, style='Card.TFrame', borderwidth=1, relief="solid") # Use a frame as a container
-        config_scroll_frame.grid(row=0, column=0, sticky="nsew", padx=(0, 10), pady=(0, 5)) # Add padding around it
-        config_scroll_frame.grid_rowconfigure(0, weight=1)
-        config_scroll_frame.grid_columnconfigure(0, weight=1)
-
-        config_canvas = tk.Canvas(config_scroll_frame, borderwidth=0, highlightthickness=0, background=self.bg_color) # Remove canvas border
-        config_canvas.grid(row=0, column=0, sticky="nsew")
-
-        scrollbar = ttk.Scrollbar(config_scroll_frame, orient="vertical", command=config_canvas.yview)
-        scrollbar.grid(row=0, column=1, sticky="ns")
-
-        config_canvas.configure(yscrollcommand=scrollbar.set)
-
-        self.config_frame_content = ttk.Frame(config_canvas, padding="15") # Padding inside the scrollable area
-        self.config_frame_content.bind("<Configure>", lambda e: config_canvas.configure(scrollregion=config_canvas.bbox("all")))
-        config_canvas.create_window((0, 0), window=self.config_frame_content, anchor="nw")
-
-        # --- Configuration Widgets ---
-        current_row = 0 # Use grid layout within config_frame_content for better control
-
-        # --- Test Cases (t) ---
-        t_frame = ttk.LabelFrame(self.config_frame_content, text="Test Cases (t)", padding=10)
-        t_frame.grid(row=current_row, column=0, sticky="ew", pady=(0, 10))
-        t_frame.grid_columnconfigure(1, weight=1) # Allow entry to expand if needed
-        current_row += 1
-
-        self.t_var = tk.BooleanVar()
-        self.t_check = ttk.Checkbutton(t_frame, text="Multiple Test Cases (t)?", variable=self.t_var, command=self.toggle_t_entry)
-        self.t_check.grid(row=0, column=0, sticky="w")
-        self.t_label = ttk.Label(t_frame, text="Number of Cases (t):")
-        self.t_entry = ttk.Entry(t_frame, width=10)
-        self.t_entry.insert(0, "10")
-        # Grid placement handled by toggle_t_entry
-
-        self.toggle_t_entry() # Set initial state
-
-        # --- Common Variables (n, m, k) ---
-        vars_frame = ttk.LabelFrame(self.config_frame_content, text="Common Variables", padding=10)
-        vars_frame.grid(row=current_row, column=0, sticky="ew", pady=(0, 10))
-        current_row += 1
-
-        self.vars_to_include = {}
-        var_row = 0
-        for var_name in ['n', 'm', 'k']:
-            frame = ttk.Frame(vars_frame) # Use a simple frame for each var line
-            frame.grid(row=var_row, column=0, sticky="ew", pady=3)
-            var_row += 1
-
-            bool_var = tk.BooleanVar(value=(var_name == 'n')) # Default n checked
-            check = ttk.Checkbutton(frame, text=f"Include {var_name}?", variable=bool_var)
-            check.pack(side=tk.LEFT, anchor=tk.W, padx=(0, 15)) # Add padding after checkbox
-
-            min_label = ttk.Label(frame, text=f"{var_name} min:")
-            min_label.pack(side=tk.LEFT)
-            min_entry = ttk.Entry(frame, width=7)
-            min_entry.insert(0, "1")
-            min_entry.pack(side=tk.LEFT, padx=(2, 10)) # Padding between min/max
-
-            max_label = ttk.Label(frame, text="max:")
-            max_label.pack(side=tk.LEFT)
-            max_entry = ttk.Entry(frame, width=7)
-            max_entry.insert(0, "10")
-            max_entry.pack(side=tk.LEFT, padx=2)
-            self.vars_to_include[var_name] = (bool_var, min_entry, max_entry)
-
-        # --- Input Structure ---
-        structure_frame = ttk.LabelFrame(self.config_frame_content, text="Input Structure per Test Case", padding=10)
-        structure_frame.grid(row=current_row, column=0, sticky="ew", pady=(0, 10))
-        current_row += 1
-
-        self.input_type = tk.StringVar(value="list_nums")
-        input_options = [
-            ("No specific structure (only n, m, k if selected)", "none"),
-            ("List/Array of N numbers", "list_nums"),
-            ("String of length N", "string_n"),
-            ("Single String (no N)", "string_single"),
-            ("N x M Matrix", "matrix"),
-            ("Fixed Variables (e.g., x y z)", "fixed_vars")
-        ]
-        for text, value in input_options:
-            ttk.Radiobutton(structure_frame, text=text, variable=self.input_type, value=value).pack(anchor=tk.W)
-
-        # --- Constraints for Structures ---
-        constraints_frame = ttk.LabelFrame(self.config_frame_content, text="Structure Constraints", padding=10)
-        constraints_frame.grid(row=current_row, column=0, sticky="ew", pady=(0, 10))
-        current_row += 1
-
-        # Value Range (Numbers)
-        num_range_frame = ttk.Frame(constraints_frame)
-        num_range_frame.pack(fill=tk.X, pady=3)
-        ttk.Label(num_range_frame, text="Value Range min:").pack(side=tk.LEFT, padx=(0, 2))
-        self.num_min_entry = ttk.Entry(num_range_frame, width=9)
-        self.num_min_entry.insert(0, "0")
-        self.num_min_entry.pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Label(num_range_frame, text="max:").pack(side=tk.LEFT, padx=(0, 2))
-        self.num_max_entry = ttk.Entry(num_range_frame, width=9)
-        self.num_max_entry.insert(0, "100")
-        self.num_max_entry.pack(side=tk.LEFT)
-
-        # Character Set (Strings)
-        char_set_frame = ttk.Frame(constraints_frame)
-        char_set_frame.pack(fill=tk.X, pady=3)
-        ttk.Label(char_set_frame, text="Char Set:").pack(side=tk.LEFT, padx=(0, 2))
-        self.char_set_var = tk.StringVar(value="lowercase")
-        char_combo = ttk.Combobox(char_set_frame, textvariable=self.char_set_var,
-                                  values=["lowercase", "uppercase", "digits", "alphanumeric", "custom"],
-                                  width=12, state="readonly")
-        char_combo.pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Label(char_set_frame, text="Custom:").pack(side=tk.LEFT, padx=(0, 2))
-        self.custom_chars_entry = ttk.Entry(char_set_frame, width=15)
-        self.custom_chars_entry.insert(0, "abc")
-        self.custom_chars_entry.pack(side=tk.LEFT)
-
-        # String Length (Single String)
-        str_len_frame = ttk.Frame(constraints_frame)
-        str_len_frame.pack(fill=tk.X, pady=3)
-        ttk.Label(str_len_frame, text="Str Len min:").pack(side=tk.LEFT, padx=(0, 2))
-        self.str_len_min_entry = ttk.Entry(str_len_frame, width=7)
-        self.str_len_min_entry.insert(0, "1")
-        self.str_len_min_entry.pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Label(str_len_frame, text="max:").pack(side=tk.LEFT, padx=(0, 2))
-        self.str_len_max_entry = ttk.Entry(str_len_frame, width=7)
-        self.str_len_max_entry.insert(0, "10")
-        self.str_len_max_entry.pack(side=tk.LEFT)
-
-        # Variable Names (Fixed Vars)
-        fixed_vars_frame = ttk.Frame(constraints_frame)
-        fixed_vars_frame.pack(fill=tk.X, pady=3)
-        ttk.Label(fixed_vars_frame, text="Var Names (space-sep):").pack(side=tk.LEFT, padx=(0, 2))
-        self.fixed_vars_entry = ttk.Entry(fixed_vars_frame, width=25)
-        self.fixed_vars_entry.insert(0, "x y")
-        self.fixed_vars_entry.pack(side=tk.LEFT)
-
-        # --- Queries ---
-        query_frame = ttk.LabelFrame(self.config_frame_content, text="Queries (Optional)", padding=10)
-        query_frame.grid(row=current_row, column=0, sticky="ew", pady=(0, 10))
-        current_row += 1
-
-        self.q_var = tk.BooleanVar()
-        self.q_check = ttk.Checkbutton(query_frame, text="Include Q queries after main input?", variable=self.q_var, command=self.toggle_q_entry)
-        self.q_check.pack(anchor=tk.W)
-
-        self.q_details_frame = ttk.Frame(query_frame, padding=(15, 5, 0, 0)) # Indent slightly
-
-        # Q Range
-        q_num_frame = ttk.Frame(self.q_details_frame)
-        q_num_frame.pack(fill=tk.X, pady=3)
-        ttk.Label(q_num_frame, text="Q min:").pack(side=tk.LEFT, padx=(0, 2))
-        self.q_min_entry = ttk.Entry(q_num_frame, width=7)
-        self.q_min_entry.insert(0, "1")
-        self.q_min_entry.pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Label(q_num_frame, text="max:").pack(side=tk.LEFT, padx=(0, 2))
-        self.q_max_entry = ttk.Entry(q_num_frame, width=7)
-        self.q_max_entry.insert(0, "10")
-        self.q_max_entry.pack(side=tk.LEFT)
-
-        # Query Value Range
-        q_format_frame = ttk.Frame(self.q_details_frame)
-        q_format_frame.pack(fill=tk.X, pady=3)
-        ttk.Label(q_format_frame, text="Query Vals min:").pack(side=tk.LEFT, padx=(0, 2))
-        self.q_val_min_entry = ttk.Entry(q_format_frame, width=9)
-        self.q_val_min_entry.insert(0, "1")
-        self.q_val_min_entry.pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Label(q_format_frame, text="max:").pack(side=tk.LEFT, padx=(0, 2))
-        self.q_val_max_entry = ttk.Entry(q_format_frame, width=9)
-        self.q_val_max_entry.insert(0, "100")
-        self.q_val_max_entry.pack(side=tk.LEFT)
-
-        self.toggle_q_entry() # Set initial state
-
-        # --- Generation Button ---
-        # Place button in its own frame for centering/padding
-        button_frame = ttk.Frame(self.config_frame_content)
-        button_frame.grid(row=current_row, column=0, pady=(20, 10))
-        button_frame.grid_columnconfigure(0, weight=1) # Center button
-        current_row += 1
-
-        self.generate_button = ttk.Button(button_frame, text="Generate Test Cases", command=self.generate_test_cases_async, style='Accent.TButton')
-        self.generate_button.grid(row=0, column=0) # Center in frame
-
-        # --- Output Frame (Right Side) ---
-        output_outer_frame = ttk.Frame(main_frame) # Add an outer frame for padding
-        output_outer_frame.grid(row=0, column=1, sticky="nsew", padx=(10, 0), pady=(0,5))
-        output_outer_frame.grid_rowconfigure(0, weight=1)
-        output_outer_frame.grid_columnconfigure(0, weight=1)
-
-        output_frame = ttk.LabelFrame(output_outer_frame, text="Generated Output", padding=10)
-        output_frame.grid(row=0, column=0, sticky="nsew")
-        output_frame.grid_rowconfigure(0, weight=1)
-        output_frame.grid_columnconfigure(0, weight=1)
-
-        # Text widget with scrollbars
-        text_frame = ttk.Frame(output_frame) # Frame to contain text and scrollbar
-        text_frame.grid(row=0, column=0, sticky="nsew", pady=(0, 5))
-        text_frame.grid_rowconfigure(0, weight=1)
-        text_frame.grid_columnconfigure(0, weight=1)
-
-        self.output_text = tk.Text(text_frame, wrap=tk.NONE, width=60, height=25,
-                                   borderwidth=1, relief="solid", font=("Courier New", 9),
-                                   undo=True, # Enable undo/redo
-                                   background="#fdfdfd") # Slightly off-white background
-        self.output_text.grid(row=0, column=0, sticky="nsew")
-
-        text_yscroll = ttk.Scrollbar(text_frame, orient="vertical", command=self.output_text.yview)
-        text_yscroll.grid(row=0, column=1, sticky="ns")
-        self.output_text['yscrollcommand'] = text_yscroll.set
-
-        text_xscroll = ttk.Scrollbar(output_frame, orient="horizontal", command=self.output_text.xview)
-        text_xscroll.grid(row=1, column=0, sticky="ew")
-        self.output_text['xscrollcommand'] = text_xscroll.set
-
-        # Save Button below text area
-        self.save_button = ttk.Button(output_frame, text="Save to File...", command=self.save_to_file, style='Std.TButton')
-        self.save_button.grid(row=2, column=0, pady=(10, 0)) # Add padding above
-
-        # --- Status Bar ---
-        self.status_var = tk.StringVar()
-        status_bar = ttk.Label(main_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W, padding=(5, 2))
-        status_bar.grid(row=1, column=0, columnspan=2, sticky="sew", padx=0, pady=(5,0)) # Span both columns at the bottom
-
-        # --- Event Bindings for Button Animations (Optional but nice) ---
-        # We'll use the built-in ttk states (:hover, :active) configured in the style map
-        # No extra bindings needed for the ttk button animations defined via style.map
-
-        self.set_status("Ready. Configure and generate test cases.", "info")
-
-
-    # --- Helper Methods ---
-    def set_status(self, message, level="info"):
-        """Updates the status bar with a message and appropriate color."""
-        self.status_var.set(message)
-        status_bar_widget = self.children['!frame'].children['!label'] # Find status bar widget
-        color = self.status_info_color
-        if level == "success":
-            color = self.status_success_color
-        elif level == "warning":
-            color = self.status_warning_color
-        elif level == "error": # Use messagebox for errors, but maybe color status too
-            color = self.status_warning_color # Or a dedicated error color
-        status_bar_widget.config(foreground=color)
-        # Clear status after a delay
-        if level != "info": # Keep 'Ready' message persistent
-            self.after(5000, lambda: self.set_status("Ready.", "info") if self.status_var.get() == message else None)
-
-
-    def toggle_t_entry(self):
-        """Shows or hides the entry field for the number of test cases using grid."""
-        if self.t_var.get():
-            self.t_label.grid(row=0, column=1, sticky="w", padx=(10, 2))
-            self.t_entry.grid(row=0, column=2, sticky="w")
-        else:
-            self.t_label.grid_forget()
-            self.t_entry.grid_forget()
 
+class _LazyModule:
+    """Stands in for an optional module until an attribute is first used, then imports it and takes its place."""
 
-    def toggle_q_entry(self):
-        """Shows or hides the frame containing query configuration options."""
-        if self.q_var.get():
-            self.q_details_frame.pack(fill=tk.X, pady=(5,0), anchor='w') # Ensure it packs correctly
-        else:
-            self.q_details_frame.pack_forget()
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
 
-    def get_int(self, entry_widget, name, default=None):
-        """Safely gets an integer from an Entry widget."""
-        try:
-            return int(entry_widget.get())
-        except ValueError:
-            messagebox.showerror("Input Error", f"Invalid integer value for '{name}'. Please enter a whole number.", parent=self)
-            self.set_status(f"Error: Invalid integer for {name}", "error")
-            return default
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+
+# Optional: the pure Python backend is used without NumPy. Importing it takes
+# longer than a small generation, so that happens when a plan first draws with it.
+np = _LazyModule("numpy", "np") if importlib.util.find_spec("numpy") is not None else None
 
-    def get_constrained_int(self, min_entry, max_entry, name):
-        """Gets min/max from entries, validates, and returns a random int in range."""
-        min_val = self.get_int(min_entry, f"{name}_min")
-        max_val = self.get_int(max_entry, f"{name}_max")
+# --- Generation Engine (no Tk dependencies) ---
 
-        if min_val is None or max_val is None:
-            return None
+CHAR_SETS = {
+    "lowercase": string.ascii_lowercase,
+    "uppercase": string.ascii_uppercase,
+    "digits": string.digits,
+    "alphanumeric": string.ascii_letters + string.digits,
+}
+
+# Numbers/characters drawn per chunk; bounds the size of each piece handed to the writer
+CHUNK_ITEMS = 1 << 14
+
+# Buffer size for generated output files
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Bytes per block of a LineIndex; the index keeps one newline count per block
+INDEX_BLOCK = 1 << 16
+
+# Longest part of a line the output viewer shows (one line of a big case can be megabytes)
+VIEW_LINE_CHARS = 4096
+
+# Approximate numbers per parallel task; sets how many consecutive cases one pool task renders
+TASK_ITEMS = 1 << 18
+
+# Compiled plans kept in memory by compile_spec
+PLAN_CACHE_SIZE = 32
+
+# Lines shorter than this stay on the pure Python path even with NumPy (setup cost dominates)
+NUMPY_MIN_ITEMS = 64
+
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+# "auto" uses NumPy when it is installed and the value range fits in int64
+BACKENDS = ("auto", "python", "numpy")
+
+# How a sum-of-n budget is split across test cases
+BUDGET_SPLITS = {
+    "random": "Random sizes",
+    "even": "Equal sizes",
+    "one_max": "Max-size cases + tiny ones",
+}
 
-        if min_val > max_val:
-             messagebox.showerror("Input Error", f"Min value ({min_val}) cannot be greater than Max value ({max_val}) for '{name}'.", parent=self)
-             self.set_status(f"Error: Min > Max for {name}", "error")
-             return None
+# Input structure value -> label shown in the GUI
+INPUT_TYPES = {
+    "none": "No specific structure (only n, m, k if selected)",
+    "list_nums": "List/Array of N numbers",
+    "string_n": "String of length N",
+    "string_single": "Single String (no N)",
+    "matrix": "N x M Matrix",
+    "fixed_vars": "Fixed Variables (e.g., x y z)",
+    "tree": "Tree with N nodes (N-1 edges)",
+    "graph": "Connected graph, N nodes, M edges",
+    "dag": "DAG, N nodes, M edges",
+}
 
-        try:
-            return random.randint(min_val, max_val)
-        except ValueError as e:
-            messagebox.showerror("Generation Error", f"Could not generate random integer for '{name}' with range {min_val}-{max_val}.\nError: {e}", parent=self)
-            self.set_status(f"Error generating random int for {name}", "error")
-            return None
-
-    def get_char_pool(self):
-        """Determines the character pool based on user selection."""
-        set_type = self.char_set_var.get()
-        pool = ""
-        if set_type == "lowercase": pool = string.ascii_lowercase
-        elif set_type == "uppercase": pool = string.ascii_uppercase
-        elif set_type == "digits": pool = string.digits
-        elif set_type == "alphanumeric": pool = string.ascii_letters + string.digits
-        elif set_type == "custom":
-            pool = self.custom_chars_entry.get()
-            if not pool:
-                messagebox.showerror("Input Error", "Custom character set cannot be empty.", parent=self)
-                self.set_status("Error: Custom char set empty", "error")
-                return None
-        else:
-             messagebox.showerror("Internal Error", f"Unknown character set type: {set_type}", parent=self)
-             self.set_status("Internal Error: Unknown char set", "error")
-             return None
-
-        if not pool:
-             messagebox.showerror("Input Error", "Character pool is empty. Cannot generate string.", parent=self)
-             self.set_status("Error: Character pool empty", "error")
-             return None
-
-        return pool
-
-    # --- Generation Logic (remains largely the same) ---
-    def generate_single_case(self):
-        """Generates the string output for a single test case."""
-        # (This core logic is mostly unchanged, but added error checks setting status)
-        lines = []
-        vars_generated = {}
+# Shape of generated trees (and of the spanning tree that keeps a 'graph' connected)
+TREE_SHAPES = {
+    "prufer": "Uniform random (Prufer)",
+    "random_parent": "Random parent",
+    "path": "Path (max depth)",
+    "star": "Star (max degree)",
+    "caterpillar": "Caterpillar",
+}
 
-        # 1. Generate n, m, k
-        first_line_parts = []
-        for var_name in ['n', 'm', 'k']:
-            is_included, min_entry, max_entry = self.vars_to_include[var_name]
-            if is_included.get():
-                val = self.get_constrained_int(min_entry, max_entry, var_name)
-                if val is None: return None
-                vars_generated[var_name] = val
-                first_line_parts.append(str(val))
-        if first_line_parts: lines.append(" ".join(first_line_parts))
-
-        n = vars_generated.get('n')
-        m = vars_generated.get('m')
-        input_structure = self.input_type.get()
-
-        # 2. Generate main structure
-        num_min = self.get_int(self.num_min_entry, "Value Range Min")
-        num_max = self.get_int(self.num_max_entry, "Value Range Max")
-        if num_min is None or num_max is None: return None
-        if num_min > num_max:
-            messagebox.showerror("Input Error", f"Min value ({num_min}) cannot be greater than Max value ({num_max}) for 'Value Range'.", parent=self)
-            self.set_status("Error: Min > Max for Value Range", "error")
-            return None
-
-        if input_structure == "list_nums":
-            if n is None: messagebox.showerror("Config Error", "Cannot generate 'List of N numbers' because 'n' is not selected.", parent=self); self.set_status("Config Error: 'n' needed for list", "error"); return None
-            if n < 0: messagebox.showerror("Config Error", f"Cannot generate list for negative N ({n}).", parent=self); self.set_status("Config Error: Negative N for list", "error"); return None
-            nums = [str(random.randint(num_min, num_max)) for _ in range(n)]
-            lines.append(" ".join(nums))
-        elif input_structure == "string_n":
-            if n is None: messagebox.showerror("Config Error", "Cannot generate 'String of length N' because 'n' is not selected.", parent=self); self.set_status("Config Error: 'n' needed for string", "error"); return None
-            if n < 0: messagebox.showerror("Config Error", f"Cannot generate string for negative N ({n}).", parent=self); self.set_status("Config Error: Negative N for string", "error"); return None
-            char_pool = self.get_char_pool();
-            if char_pool is None: return None
-            lines.append("".join(random.choices(char_pool, k=n)))
-        elif input_structure == "string_single":
-            str_len = self.get_constrained_int(self.str_len_min_entry, self.str_len_max_entry, "String Length")
-            if str_len is None: return None
-            if str_len < 0: messagebox.showerror("Config Error", f"Cannot generate string for negative length ({str_len}).", parent=self); self.set_status("Config Error: Negative string length", "error"); return None
-            char_pool = self.get_char_pool();
-            if char_pool is None: return None
-            lines.append("".join(random.choices(char_pool, k=str_len)))
-        elif input_structure == "matrix":
-            if n is None or m is None: messagebox.showerror("Config Error", "Cannot generate 'N x M Matrix' because 'n' or 'm' is not selected.", parent=self); self.set_status("Config Error: 'n' and 'm' needed for matrix", "error"); return None
-            if n < 0 or m < 0: messagebox.showerror("Config Error", f"Cannot generate matrix for negative N ({n}) or M ({m}).", parent=self); self.set_status("Config Error: Negative N/M for matrix", "error"); return None
-            for _ in range(n):
-                row = [str(random.randint(num_min, num_max)) for _ in range(m)]
-                lines.append(" ".join(row))
-        elif input_structure == "fixed_vars":
-            var_names_str = self.fixed_vars_entry.get()
-            if not var_names_str.strip(): messagebox.showerror("Input Error", "Variable names cannot be empty for 'Fixed Variables'.", parent=self); self.set_status("Input Error: Fixed var names empty", "error"); return None
-            var_names = var_names_str.split()
-            vals = [str(random.randint(num_min, num_max)) for _ in var_names]
-            lines.append(" ".join(vals))
-
-        # 3. Generate Queries
-        if self.q_var.get():
-            q_count = self.get_constrained_int(self.q_min_entry, self.q_max_entry, "Number of Queries (Q)")
-            if q_count is None: return None
-            if q_count < 0: messagebox.showerror("Config Error", f"Cannot generate negative number of queries ({q_count}).", parent=self); self.set_status("Config Error: Negative Q", "error"); return None
-
-            q_val_min = self.get_int(self.q_val_min_entry, "Query Val Min")
-            q_val_max = self.get_int(self.q_val_max_entry, "Query Val Max")
-            if q_val_min is None or q_val_max is None: return None
-            if q_val_min > q_val_max: messagebox.showerror("Input Error", f"Min value ({q_val_min}) cannot be greater than Max value ({q_val_max}) for 'Query Val Range'.", parent=self); self.set_status("Input Error: Min > Max for Query Vals", "error"); return None
-
-            lines.append(str(q_count))
-            for _ in range(q_count):
-                q_line = f"{random.randint(q_val_min, q_val_max)} {random.randint(q_val_min, q_val_max)}"
-                lines.append(q_line)
 
-        return "\n".join(lines)
+class SpecError(ValueError):
+    """Raised when a generation spec is invalid or cannot be generated."""
 
-    def _perform_generation(self):
-        """Internal method to run the generation logic."""
-        output_content = []
-        generation_successful = True # Flag to track success
 
-        try:
-            if self.t_var.get():
-                num_test_cases = self.get_int(self.t_entry, "Number of Test Cases (t)")
-                if num_test_cases is None: generation_successful = False
-                if generation_successful and num_test_cases <= 0:
-                    messagebox.showerror("Input Error", "Number of test cases 't' must be positive.", parent=self)
-                    self.set_status("Error: 't' must be positive", "error")
-                    generation_successful = False
-                if generation_successful and num_test_cases > 10000:
-                    # Use status bar for warnings
-                    self.set_status("Warning: Generating a large number of test cases (> 10000)...", "warning")
-                    self.update_idletasks() # Ensure message is shown
-
-                if generation_successful:
-                    output_content.append(str(num_test_cases))
-                    for i in range(num_test_cases):
-                        single_case_output = self.generate_single_case()
-                        if single_case_output is None:
-                            self.output_text.insert(tk.END, f"--- Error generating test case #{i+1}. Aborting. ---\n")
-                            self.set_status(f"Error generating test case #{i+1}", "error")
-                            generation_successful = False
-                            break # Stop generation on the first error
-                        output_content.append(single_case_output)
-                        # Optional: Update status periodically for long generations
-                        # if i % 100 == 0:
-                        #    self.set_status(f"Generating case {i+1}/{num_test_cases}...", "info")
-                        #    self.update_idletasks()
-            else:
-                # Single test case
-                single_case_output = self.generate_single_case()
-                if single_case_output is None:
-                    self.output_text.insert(tk.END, "--- Error generating the test case. ---\n")
-                    # Error message already shown by generate_single_case or helpers
-                    generation_successful = False
-                else:
-                    output_content.append(single_case_output)
-
-            # Display result if successful
-            if generation_successful:
-                self.output_text.delete('1.0', tk.END) # Clear previous output *only if successful*
-                final_output = "\n".join(output_content)
-                self.output_text.insert(tk.END, final_output)
-                if final_output and not final_output.endswith('\n'):
-                    self.output_text.insert(tk.END, "\n") # Ensure trailing newline
-                self.set_status("Test cases generated successfully! Good luck!", "success")
-
-        except Exception as e:
-            # Catch unexpected errors during generation
-            messagebox.showerror("Unexpected Error", f"An unexpected error occurred during generation:\n{e}", parent=self)
-            self.set_status(f"Unexpected generation error: {e}", "error")
-            generation_successful = False
+class GenerationCancelled(Exception):
+    """Raised by write_output when its cancel event is set; args[0] is the case being generated."""
 
-        finally:
-            # Re-enable the button regardless of success or failure
-            self.generate_button.config(state=tk.NORMAL, text="Generate Test Cases")
 
+class _ActiveCancel(threading.local):
+    event = None # cancel_event of the write_output running on this thread
 
-    def generate_test_cases_async(self):
-        """
-        Handles the button state change and calls the generation logic.
-        Uses `after(1)` to allow the UI to update before potentially
-        long-running generation starts.
-        """
-        self.output_text.delete('1.0', tk.END) # Clear output area immediately
-        self.generate_button.config(state=tk.DISABLED, text="Generating...")
-        self.set_status("Generating...", "info")
-        self.update_idletasks() # Force UI update to show disabled state/text
 
-        # Run the actual generation slightly delayed to let UI update
-        self.after(10, self._perform_generation)
+_cancelling = _ActiveCancel()
 
 
-    def save_to_file(self):
-        """Saves the content of the output text area to a user-selected file."""
-        content = self.output_text.get('1.0', tk.END).rstrip()
-        if not content:
-            # Use status bar instead of messagebox for this warning
-            self.set_status("Warning: Output area is empty. Nothing to save.", "warning")
-            return
+def cancel_point():
+    """
+    Raises GenerationCancelled (write_output fills in the case number) once the
+    write_output running on this thread is cancelled. O(n) loops that run before
+    a body's first chunk call it every CHUNK_ITEMS items, so Cancel never waits on them.
+    """
+    event = _cancelling.event
+    if event is not None and event.is_set():
+        raise GenerationCancelled(None)
+
+
+def _chunks(items):
+    """`items` (a list or range) in slices of CHUNK_ITEMS, with a cancel_point() before each."""
+    for start in range(0, len(items), CHUNK_ITEMS):
+        cancel_point()
+        yield items[start:start + CHUNK_ITEMS]
+
+
+@dataclass(frozen=True)
+class GenerationSpec:
+    """Immutable description of a test case layout, independent of the GUI."""
+    num_cases: int = None                # None -> single case, no leading 't' line
+    variables: tuple = (("n", 1, 10),)   # (name, min, max) for each included variable, in output order
+    input_type: str = "list_nums"
+    value_range: tuple = (0, 100)
+    char_set: str = "lowercase"
+    custom_chars: str = "abc"
+    str_len_range: tuple = (1, 10)
+    fixed_var_names: tuple = ("x", "y")
+    query_count_range: tuple = None      # None -> no queries
+    query_value_range: tuple = (1, 100)
+    query_template: str = None           # e.g. "3: 1 {l:1..n} {r:l..n} | 1: 2 {i:1..n} {x}"; None -> two values per query
+    backend: str = "auto"
+    seed: int = None                     # Master seed; None -> a fresh one per run
+    distribution: str = "uniform"        # Stress preset, see NUMBER_DISTRIBUTIONS / STRING_DISTRIBUTIONS
+    tree_shape: str = "prufer"           # For 'tree' and the spanning tree of 'graph'
+    weighted_edges: bool = False         # Append a weight from value_range to every edge
+    n_budget: int = None                 # Exact sum of n over all cases (Codeforces "sum of n <= ..."); None -> independent n
+    budget_split: str = "random"
+    constraint: str = "none"             # Distinct / permutation / sorted values, see CONSTRAINTS
+    char_weights: tuple = None           # One weight per character (or word) of the char set; None -> uniform
+
+
+# --- Stage timing (profiling hooks; free unless a StageTimer is passed in) ---
+
+# Stages reported as a share of the generation stages rather than on their own
+NESTED_STAGES = ("format",)
+
 
-        filepath = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Text Files", "*.txt"), ("Input Files", "*.in"), ("All Files", "*.*")],
-            title="Save Test Cases As",
-            parent=self
-        )
-        if not filepath:
-            self.set_status("Save cancelled.", "info")
+class _ActiveTimer(threading.local):
+    timer = None # StageTimer collecting "format" time on this thread, see StageTimer.activate
+
+
+_profiling = _ActiveTimer()
+
+
+def _format_seconds(seconds):
+    if seconds < 0.01:
+        return f"{seconds * 1000:.1f} ms"
+    return f"{seconds * 1000:.0f} ms" if seconds < 1 else f"{seconds:.2f} s"
+
+
+class StageTimer:
+    """
+    Wall-clock seconds per pipeline stage ("compile", "body:matrix", "queries",
+    "write", "render", ...), in the order the stages first ran. "format" is
+    nested: it is the part of the generation stages spent encoding numbers.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+        self.started = time.perf_counter()
+
+    def add(self, stage, seconds):
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def measure(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Makes this the timer the encoders of the current thread report "format" time to."""
+        previous = _profiling.timer
+        _profiling.timer = self
+        try:
+            yield self
+        finally:
+            _profiling.timer = previous
+
+    def timed_call(self, stage, func):
+        """`func` wrapped so that every call adds to `stage`."""
+        perf_counter = time.perf_counter
+
+        def timed(*args):
+            start = perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self.add(stage, perf_counter() - start)
+        return timed
+
+    def timed_chunks(self, stage, make_chunks):
+        """Yields from make_chunks(), adding the call and every next() (not the consumer's time) to `stage`."""
+        perf_counter = time.perf_counter
+        start = perf_counter()
+        chunks = iter(make_chunks())
+        self.add(stage, perf_counter() - start)
+        while True:
+            start = perf_counter()
+            chunk = next(chunks, None)
+            self.add(stage, perf_counter() - start)
+            if chunk is None:
+                return
+            yield chunk
+
+    def report(self):
+        """A table of seconds and share of the elapsed time per stage, for the terminal."""
+        total = time.perf_counter() - self.started
+        top_level = [stage for stage in self.seconds if stage not in NESTED_STAGES]
+        rows = [(stage, self.seconds[stage]) for stage in top_level]
+        rows.append(("other", max(0.0, total - sum(seconds for _, seconds in rows))))
+        rows += [(f"  ({stage})", self.seconds[stage]) for stage in NESTED_STAGES if stage in self.seconds]
+        width = max(len(stage) for stage, _ in rows) + 2
+        lines = [f"{'stage':<{width}}{'seconds':>10}{'share':>8}"]
+        lines += [f"{stage:<{width}}{seconds:>10.4f}{seconds / total if total else 0:>8.1%}" for stage, seconds in rows]
+        lines.append(f"{'total':<{width}}{total:>10.4f}")
+        return "\n".join(lines)
+
+    def summary(self):
+        """One line for a status bar, e.g. "compile 1 ms, body:matrix 0.84 s, write 40 ms; format 0.31 s"."""
+        top_level = [f"{stage} {_format_seconds(seconds)}" for stage, seconds in self.seconds.items()
+                     if stage not in NESTED_STAGES]
+        nested = [f"{stage} {_format_seconds(self.seconds[stage])}" for stage in NESTED_STAGES if stage in self.seconds]
+        return "; ".join(filter(None, [", ".join(top_level), ", ".join(nested)]))
+
+
+def _timed_stage(stage):
+    """Decorator: adds the function's run time to the thread's active StageTimer, if there is one."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            timer = _profiling.timer
+            if timer is None:
+                return func(*args)
+            start = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                timer.add(stage, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+# --- Integer text encoding ---
+# One %-format call turns a whole chunk of ints into text in C, without a str
+# object per number or per row; the format strings are cached per shape.
+
+@functools.lru_cache(maxsize=64)
+def _ints_format(count):
+    return " ".join(["%d"] * count)
+
+
+@functools.lru_cache(maxsize=64)
+def _int_rows_format(width, rows):
+    return (" ".join(["%d"] * width) + "\n") * rows
+
+
+@_timed_stage("format")
+def format_ints(values):
+    """Space-separated decimal text of a list of ints (no newline)."""
+    return _ints_format(len(values)) % tuple(values)
+
+
+@_timed_stage("format")
+def format_int_rows(values, width):
+    """Text of a flat list of ints as lines of `width` numbers each (width > 0)."""
+    return _int_rows_format(width, len(values) // width) % tuple(values)
+
+
+@_timed_stage("format")
+def format_query_block(line_format, count, columns):
+    """Text of `count` query lines, `line_format` filled with one value of every column per line (if any)."""
+    if not columns:
+        return line_format * count
+    return (line_format * count) % tuple(itertools.chain.from_iterable(zip(*columns)))
+
+
+@_timed_stage("format")
+def join_interleaved(lines, kinds):
+    """Joins the next line of lines[kind] for every kind in `kinds` (the lines may be formatted lazily)."""
+    return "".join(map(next, map(lines.__getitem__, kinds)))
+
+
+def _check_range(bounds, name):
+    """Validates a (min, max) pair and returns it as a tuple of ints."""
+    try:
+        lo, hi = bounds
+    except (TypeError, ValueError):
+        raise SpecError(f"Range for '{name}' must be a (min, max) pair, got {bounds!r}.")
+    if not isinstance(lo, int) or not isinstance(hi, int) or isinstance(lo, bool) or isinstance(hi, bool):
+        raise SpecError(f"Invalid integer value for '{name}'. Please enter a whole number.")
+    if lo > hi:
+        raise SpecError(f"Min value ({lo}) cannot be greater than Max value ({hi}) for '{name}'.")
+    return lo, hi
+
+
+def resolve_char_pool(char_set, custom_chars=""):
+    """Returns the characters strings are drawn from for a char set name ("words": a tuple of words)."""
+    if char_set == "words":
+        words = tuple(custom_chars.split())
+        if not words:
+            raise SpecError("Word list cannot be empty (enter the words, separated by spaces, as custom characters).")
+        return words
+    if char_set == "custom":
+        if not custom_chars:
+            raise SpecError("Custom character set cannot be empty.")
+        return custom_chars
+    if char_set not in CHAR_SETS:
+        raise SpecError(f"Unknown character set type: {char_set}")
+    return CHAR_SETS[char_set]
+
+
+# --- Trees and graphs (0-based node pairs; the plan relabels and formats them) ---
+
+def _shuffle(rng, items):
+    """Fisher-Yates shuffle driven by rng.random(); several times faster than rng.shuffle for large lists."""
+    random_ = rng.random
+    for top in range(len(items) - 1, 0, -CHUNK_ITEMS):
+        cancel_point()
+        for i in range(top, max(top - CHUNK_ITEMS, 0), -1):
+            j = int(random_() * (i + 1))
+            items[i], items[j] = items[j], items[i]
+
+
+def prufer_decode(sequence, n):
+    """Decodes a Prufer sequence over 0..n-1 into the n-1 edges of its tree, in O(n)."""
+    if n == 1:
+        return []
+    degree = [1] * n
+    for block in _chunks(sequence):
+        for node in block:
+            degree[node] += 1
+    pointer = degree.index(1)
+    leaf = pointer
+    edges = []
+    for block in _chunks(sequence):
+        for node in block:
+            edges.append((leaf, node))
+            degree[node] -= 1
+            if degree[node] == 1 and node < pointer:
+                leaf = node
+            else:
+                pointer += 1
+                while degree[pointer] != 1:
+                    pointer += 1
+                leaf = pointer
+    edges.append((leaf, n - 1))
+    return edges
+
+
+def tree_edges(rng, n, shape):
+    """The n-1 edges of a tree of the given TREE_SHAPES shape, in O(n)."""
+    random_ = rng.random
+    if shape == "prufer":
+        return prufer_decode([int(random_() * n) for block in _chunks(range(n - 2)) for _ in block], n)
+    if shape == "random_parent":
+        return [(int(random_() * child), child) for block in _chunks(range(1, n)) for child in block]
+    if shape == "path":
+        return [(node - 1, node) for block in _chunks(range(1, n)) for node in block]
+    if shape == "star":
+        return [(0, node) for block in _chunks(range(1, n)) for node in block]
+    if shape == "caterpillar":
+        spine = max(1, n // 2)
+        return ([(node - 1, node) for block in _chunks(range(1, spine)) for node in block]
+                + [(int(random_() * spine), node) for block in _chunks(range(spine, n)) for node in block])
+    raise SpecError(f"Unknown tree shape: {shape}")
+
+
+def _pair_index(u, v):
+    """Index of the unordered pair {u, v} in the triangular order (0,1), (0,2), (1,2), (0,3), ..."""
+    if u > v:
+        u, v = v, u
+    return v * (v - 1) // 2 + u
+
+
+def _pair_at(index):
+    """Inverse of _pair_index."""
+    v = (1 + math.isqrt(1 + 8 * index)) // 2
+    return index - v * (v - 1) // 2, v
+
+
+def _pairs_at(indices):
+    """[_pair_at(index) for index in indices], with cancel points."""
+    return [_pair_at(index) for block in _chunks(indices) for index in block]
+
+
+def _sample_indices(rng, total, k, exclude=frozenset()):
+    """
+    k distinct ints from range(total) that are not in `exclude`, in O(k + len(exclude))
+    expected time. Sparse requests use hash-set rejection (each draw succeeds with
+    probability >= 1/2); dense ones enumerate the allowed indices and pick k of them
+    with a partial Fisher-Yates shuffle, so there is no quadratic retry loop.
+    """
+    if 2 * (k + len(exclude)) <= total:
+        chosen = set(exclude)
+        result = []
+        draw = rng.random if total <= 1 << 53 else None
+        randrange = rng.randrange
+        while len(result) < k:
+            cancel_point()
+            target = min(k, len(result) + CHUNK_ITEMS)
+            while len(result) < target:
+                index = int(draw() * total) if draw else randrange(total)
+                if index not in chosen:
+                    chosen.add(index)
+                    result.append(index)
+        return result
+    pool = [index for block in _chunks(range(total)) for index in block if index not in exclude]
+    random_ = rng.random
+    for block in _chunks(range(k)):
+        for i in block:
+            j = i + int(random_() * (len(pool) - i))
+            pool[i], pool[j] = pool[j], pool[i]
+    return pool[:k]
+
+
+def graph_edges(rng, n, m, shape):
+    """
+    Edges of a connected simple graph: a spanning tree of `shape` plus m-(n-1)
+    distinct extra pairs, deduplicated by pair index with _sample_indices, in O(n + m).
+    """
+    edges = tree_edges(rng, n, shape)
+    extra = m - len(edges)
+    if extra > 0:
+        in_tree = {_pair_index(u, v) for block in _chunks(edges) for u, v in block}
+        edges.extend(_pairs_at(_sample_indices(rng, n * (n - 1) // 2, extra, in_tree)))
+    return edges
+
+
+def dag_edges(rng, n, m):
+    """m distinct edges (u, v) with u < v; relabeling by a random permutation hides the order."""
+    return _pairs_at(_sample_indices(rng, n * (n - 1) // 2, m))
+
+
+# --- Query templates ---
+
+_WEIGHT_PREFIX = re.compile(r"^\s*(\d+(?:\.\d*)?)\s*:(.*)$", re.DOTALL)
+_BOUND = re.compile(r"^\s*(?:([A-Za-z_]\w*)|(-?\d+))\s*(?:([+-])\s*(\d+))?\s*$")
+
+
+def _parse_bound(text, known):
+    """'n-1' -> ('n', -1), '5' -> (None, 5); `known` are the names the bound may refer to."""
+    match = _BOUND.match(text)
+    if not match:
+        raise SpecError(f"Invalid query template bound '{text}' (expected a number or a name with an optional +/- offset).")
+    name, number, sign, offset = match.groups()
+    if name is not None and name not in known:
+        raise SpecError(f"Query template bound '{text}' refers to unknown '{name}' (known: {', '.join(known)}).")
+    offset = int(offset or 0) * (-1 if sign == "-" else 1)
+    return (name, offset) if name is not None else (None, int(number) + offset)
+
+
+def parse_query_template(template, variable_names, value_range):
+    """
+    Compiles a query template into [(weight, line_format, slots)], where line_format
+    is a %-format string with one %d per slot (plain text if it has none). Alternatives are
+    separated by '|' and may start with a weight ('3: ...'). Each token is literal
+    text or a slot: '{x}' or '{}' draws from `value_range`, '{i:1..n}' or '{1..n}'
+    from a range whose bounds are numbers, the case's variables, 'q' (the query
+    count) or earlier slots of the same alternative, with an optional +/- offset.
+    Slots are (name, lo, hi, source) with lo/hi as (name or None, offset).
+    """
+    alternatives = []
+    for text in template.split("|"):
+        weight = 1.0
+        match = _WEIGHT_PREFIX.match(text)
+        if match:
+            weight, text = float(match.group(1)), match.group(2)
+        tokens = text.split()
+        if not tokens:
+            raise SpecError("Query template has an empty alternative.")
+        known = list(variable_names) + ["q"]
+        parts, slots = [], []
+        for token in tokens:
+            if not (token.startswith("{") and token.endswith("}")):
+                if "{" in token or "}" in token:
+                    raise SpecError(f"Invalid query template token '{token}' (a slot must be a whole token, e.g. {{i:1..n}}).")
+                parts.append(token.replace("%", "%%"))
+                continue
+            inner = token[1:-1]
+            if ":" in inner:
+                name, bounds = inner.split(":", 1)
+            elif ".." in inner:
+                name, bounds = "", inner
+            else:
+                name, bounds = inner, ""
+            if name and (not name.isidentifier() or name in known):
+                raise SpecError(f"Query template slot name '{name}' is invalid or already used.")
+            if bounds:
+                lo_text, dots, hi_text = bounds.partition("..")
+                if not dots:
+                    raise SpecError(f"Query template slot '{token}' needs a range like {{i:1..n}}.")
+                lo, hi = _parse_bound(lo_text, known), _parse_bound(hi_text, known)
+            else:
+                lo, hi = (None, value_range[0]), (None, value_range[1])
+            slots.append((name, lo, hi, token))
+            parts.append("%d")
+            if name:
+                known.append(name)
+        if weight <= 0:
+            raise SpecError(f"Query template weights must be positive (got {weight:g}).")
+        line_format = " ".join(parts) + "\n"
+        alternatives.append((weight, line_format if slots else line_format % (), slots))
+    return alternatives
+
+
+# --- Character pools (weights and words; sampling tables built once per plan) ---
+
+def alias_table(weights):
+    """
+    Vose's alias table for drawing index i with probability weights[i] / sum:
+    pick a column uniformly, keep it with probability[column], else take
+    alias[column]. O(len) to build, O(1) per draw.
+    """
+    count = len(weights)
+    total = sum(weights)
+    scaled = [weight * count / total for weight in weights]
+    probability = [1.0] * count
+    alias = list(range(count))
+    small = [index for index, value in enumerate(scaled) if value < 1.0]
+    large = [index for index, value in enumerate(scaled) if value >= 1.0]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        probability[less] = scaled[less]
+        alias[less] = more
+        scaled[more] -= 1.0 - scaled[less]
+        (small if scaled[more] < 1.0 else large).append(more)
+    return probability, alias # Columns left over (rounding) keep probability 1
+
+
+def _check_weights(weights, count, what):
+    """Validates one non-negative weight per token and returns them as a tuple."""
+    if not isinstance(weights, (list, tuple)) or len(weights) != count:
+        raise SpecError(f"Character weights need exactly one number per {what} ({count}).")
+    for weight in weights:
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not 0 <= weight < math.inf:
+            raise SpecError(f"Character weights must be non-negative numbers, got {weight!r}.")
+    if not sum(weights) > 0:
+        raise SpecError("At least one character weight must be positive.")
+    return tuple(weights)
+
+
+class CharPool:
+    """
+    The characters (or words) strings are drawn from, with optional weights.
+    The tables are built once per plan: cumulative weights for the pure Python
+    draw, an alias table for NumPy. It indexes like its tokens, so the stress
+    distributions can use it as a plain sequence.
+    """
+
+    def __init__(self, tokens, weights=None, separator="", use_numpy=False):
+        self.tokens = tokens
+        self.separator = separator # Between words; "" for characters
+        self.cum_weights = None
+        self._alias = None
+        self._np_tables = None
+        if weights is not None:
+            self.cum_weights = list(itertools.accumulate(weights))
+            if use_numpy:
+                self._alias = alias_table(weights)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __getitem__(self, index):
+        return self.tokens[index]
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+    def draw(self, rng, count):
+        """`count` random tokens (by weight, if any) as a list."""
+        if self._alias is not None and count >= NUMPY_MIN_ITEMS:
+            return self._np_draw(rng, count)
+        return rng.choices(self.tokens, cum_weights=self.cum_weights, k=count)
+
+    def _np_draw(self, rng, count):
+        if self._np_tables is None:
+            probability, alias = self._alias
+            self._np_tables = (np.array(probability), np.array(alias, dtype=np.int64),
+                               np.array(list(self.tokens), dtype=object))
+        probability, alias, tokens = self._np_tables
+        generator = np.random.default_rng(rng.getrandbits(64))
+        columns = generator.integers(0, len(probability), size=count)
+        columns = np.where(generator.random(count) < probability[columns], columns, alias[columns])
+        return tokens[columns].tolist()
+
+    def text(self, token_lists):
+        """Yields the text of consecutive token lists, with the separator between every two tokens."""
+        join = self.separator.join
+        lead = ""
+        for tokens in token_lists:
+            if tokens:
+                yield lead + join(tokens)
+                lead = self.separator
+
+
+# --- Stress distributions (all O(count), streamed value by value) ---
+
+# Bucket count of libstdc++'s unordered_map around 10^5 elements; keys that are all multiples
+# of it land in one bucket and make every lookup linear
+ANTI_HASH_PRIME = 107897
+
+
+def _numbers_all_equal(rng, count, lo, hi):
+    return itertools.repeat(rng.randint(lo, hi), count)
+
+
+def _numbers_sorted(rng, count, lo, hi):
+    # Uniform order statistics in ascending order: the minimum of k uniforms on (u, 1)
+    # is 1 - (1 - u) * V^(1/k), so no sort (and no buffering) is needed
+    span = hi - lo + 1
+    u = 0.0
+    random_ = rng.random
+    for remaining in range(count, 0, -1):
+        u += (1.0 - u) * (1.0 - random_() ** (1.0 / remaining))
+        yield min(hi, lo + int(u * span))
+
+
+def _numbers_reverse_sorted(rng, count, lo, hi):
+    # Descending order statistics: the maximum of k uniforms on (0, u) is u * V^(1/k)
+    span = hi - lo + 1
+    u = 1.0
+    random_ = rng.random
+    for remaining in range(count, 0, -1):
+        u *= random_() ** (1.0 / remaining)
+        yield min(hi, lo + int(u * span))
+
+
+def _numbers_few_distinct(rng, count, lo, hi):
+    pool = [rng.randint(lo, hi) for _ in range(max(1, min(hi - lo + 1, math.isqrt(count))))]
+    choice = rng.choice
+    return (choice(pool) for _ in range(count))
+
+
+def _numbers_anti_hash(rng, count, lo, hi):
+    # Distinct multiples of ANTI_HASH_PRIME (cycling if the range holds fewer than `count`)
+    first = -(-lo // ANTI_HASH_PRIME)
+    available = hi // ANTI_HASH_PRIME - first + 1
+    offset = rng.randrange(available)
+    return ((first + (offset + i) % available) * ANTI_HASH_PRIME for i in range(count))
+
+
+def _numbers_anti_quicksort(rng, count, lo, hi):
+    # Musser's median-of-3 killer permutation in closed form (quadratic for quicksort that
+    # picks the median of first/middle/last), mapped monotonically onto [lo, hi]
+    span = hi - lo + 1
+    full = count - count % 4
+    half = full // 2
+    for i in range(1, count + 1):
+        if i > full:
+            p = i
+        elif i > half:
+            p = 2 * (i - half)
+        elif i % 2:
+            p = i
+        else:
+            p = half + i - 1
+        yield lo + p - 1 if span >= count else lo + (p - 1) * span // count
+
+
+def _repeated_char(char, length):
+    for start in range(0, length, CHUNK_ITEMS):
+        yield char * min(CHUNK_ITEMS, length - start)
+
+
+def _chars_all_same(rng, length, pool):
+    return _repeated_char(rng.choice(pool), length)
+
+
+def _two_chars(rng, pool):
+    """Two distinct characters from the pool (the same one twice if it has only one)."""
+    if len(set(pool)) < 2:
+        return pool[0], pool[0]
+    first = rng.choice(pool)
+    second = rng.choice(pool)
+    while second == first:
+        second = rng.choice(pool)
+    return first, second
+
+
+def _chars_anti_kmp(rng, length, pool):
+    # "aaa...ab": maximal border chains for prefix-function / naive matching
+    a, b = _two_chars(rng, pool)
+    if length:
+        yield from _repeated_char(a, length - 1)
+        yield b
+
+
+def _chars_alternating(rng, length, pool):
+    a, b = _two_chars(rng, pool)
+    pair = a + b
+    for start in range(0, length, CHUNK_ITEMS):
+        yield (pair * (CHUNK_ITEMS // 2 + 1))[start % 2:start % 2 + min(CHUNK_ITEMS, length - start)]
+
+
+def _chars_fibonacci(rng, length, pool):
+    # Prefix of the infinite Fibonacci word; floor(i * phi) is computed exactly with isqrt
+    a, b = _two_chars(rng, pool)
+    isqrt = math.isqrt
+    for start in range(0, length, CHUNK_ITEMS):
+        chunk = []
+        for i in range(start + 1, start + 1 + min(CHUNK_ITEMS, length - start)):
+            step = (i + 1 + isqrt(5 * (i + 1) * (i + 1))) // 2 - (i + isqrt(5 * i * i)) // 2
+            chunk.append(a if step == 2 else b)
+        yield "".join(chunk)
+
+
+def _chars_palindrome(rng, length, pool):
+    # The first half is drawn chunk by chunk from per-chunk seeds and replayed backwards
+    # for the second half, so memory stays O(CHUNK_ITEMS) however long the string is
+    half = length // 2
+    base = rng.getrandbits(64)
+    starts = range(0, half, CHUNK_ITEMS)
+
+    def chunk(start):
+        return pool.draw(random.Random(derive_seed(base, start)), min(CHUNK_ITEMS, half - start))
+
+    def pieces():
+        for start in starts:
+            yield chunk(start)
+        yield pool.draw(rng, length % 2)
+        for start in reversed(starts):
+            yield chunk(start)[::-1]
+
+    return pool.text(pieces())
+
+
+def _chars_brackets(rng, length, pool):
+    # Uniformly random balanced sequence, one step at a time: from height h with r steps
+    # left, opening leads to (h+2)(r-h) / (2r(h+1)) of the completions. Consecutive pairs
+    # of the char set are the bracket types ("()[]"); the plan keeps the length even.
+    openers, closers = pool[0::2], pool[1::2]
+    types = len(closers)
+    randrange, random_ = rng.randrange, rng.random
+    stack = [] # Open bracket types; only needed with more than one type
+    height = 0
+    for start in range(length, 0, -CHUNK_ITEMS):
+        chunk = []
+        append = chunk.append
+        for remaining in range(start, max(start - CHUNK_ITEMS, 0), -1):
+            if height and random_() * (2 * remaining * (height + 1)) >= (height + 2) * (remaining - height):
+                height -= 1
+                append(closers[stack.pop()] if types > 1 else closers[0])
+            else:
+                height += 1
+                if types > 1:
+                    kind = randrange(types)
+                    stack.append(kind)
+                    append(openers[kind])
+                else:
+                    append(openers[0])
+        yield "".join(chunk)
+
+
+def _chars_periodic(rng, length, pool):
+    # A random pattern of length p <= sqrt(length), repeated: it occurs at every multiple of p
+    period = rng.randint(1, max(1, math.isqrt(length)))
+    if not length:
+        return iter(())
+    block = pool.draw(rng, period)
+    block *= max(1, CHUNK_ITEMS // period)
+    return pool.text(block[:length - start] for start in range(0, length, len(block)))
+
+
+# Distribution name -> (label, generator); None means plain uniform draws
+NUMBER_DISTRIBUTIONS = {
+    "uniform": ("Uniform random", None),
+    "all_equal": ("All equal", _numbers_all_equal),
+    "sorted": ("Sorted (non-decreasing)", _numbers_sorted),
+    "reverse_sorted": ("Reverse sorted", _numbers_reverse_sorted),
+    "few_distinct": ("Few distinct values (~sqrt n)", _numbers_few_distinct),
+    "anti_hash": (f"Anti-hash (multiples of {ANTI_HASH_PRIME})", _numbers_anti_hash),
+    "anti_quicksort": ("Median-of-3 quicksort killer", _numbers_anti_quicksort),
+}
+
+STRING_DISTRIBUTIONS = {
+    "uniform": ("Uniform random", None),
+    "all_same": ("One repeated character", _chars_all_same),
+    "anti_kmp": ("aaa...ab (anti-KMP)", _chars_anti_kmp),
+    "alternating": ("ababab...", _chars_alternating),
+    "fibonacci": ("Fibonacci word", _chars_fibonacci),
+    "palindrome": ("Palindrome", _chars_palindrome),
+    "brackets": ("Balanced brackets (char set pairs, e.g. ()[])", _chars_brackets),
+    "periodic": ("Periodic (random pattern repeated)", _chars_periodic),
+}
+
+# String distributions that draw through CharPool.draw, so they honour weights and words
+SAMPLED_STRING_DISTRIBUTIONS = ("uniform", "palindrome", "periodic")
+
+# Distributions whose strings stop being valid if characters are removed or changed
+SHAPED_STRING_DISTRIBUTIONS = ("palindrome", "brackets")
+
+
+def distributions_for(input_type):
+    """The distribution table that applies to an input structure (None if it has no data)."""
+    if input_type in ("list_nums", "matrix", "fixed_vars"):
+        return NUMBER_DISTRIBUTIONS
+    if input_type in ("string_n", "string_single"):
+        return STRING_DISTRIBUTIONS
+    return None
+
+
+# --- Value constraints (distinct, permutation, sorted; O(count), no retry loops) ---
+
+# Constraint -> label shown in the GUI. Lists and matrices (in row-major order)
+# take them all; strings apply them to their characters, ordered by code point.
+CONSTRAINTS = {
+    "none": "None",
+    "distinct": "Distinct values",
+    "permutation": "Permutation of 1..count",
+    "sorted": "Non-decreasing",
+    "increasing": "Strictly increasing",
+}
+
+
+def constraints_for(input_type):
+    """The constraints that apply to an input structure (None if it has no values to constrain)."""
+    if input_type in ("list_nums", "matrix"):
+        return CONSTRAINTS
+    if input_type in ("string_n", "string_single"):
+        return {name: label for name, label in CONSTRAINTS.items() if name != "permutation"}
+    return None
+
+
+def sorted_sample(rng, total, k):
+    """
+    k distinct ints from range(total) in increasing order. Dense requests draw
+    the total - k indices to leave out and sweep a bytearray, in O(total) = O(k);
+    sparse ones sort the O(k) sample, which runs in C.
+    """
+    if 2 * k > total:
+        keep = bytearray(b"\x01") * total
+        for block in _chunks(_sample_indices(rng, total, total - k)):
+            for index in block:
+                keep[index] = 0
+        return list(itertools.compress(range(total), keep))
+    indices = _sample_indices(rng, total, k)
+    indices.sort()
+    return indices
+
+
+def _np_sample_indices(generator, total, k):
+    """
+    _sample_indices with a NumPy generator for sparse requests (4k < total):
+    rejection in bulk, drawing the missing indices and dropping repeats after a
+    sort until k are distinct, in O(k) memory.
+    """
+    indices = np.empty(0, dtype=np.int64)
+    while len(indices) < k:
+        cancel_point()
+        indices = np.sort(np.concatenate((indices, generator.integers(total, size=k - len(indices)))))
+        indices = indices[np.concatenate(([True], indices[1:] != indices[:-1]))]
+    generator.shuffle(indices)
+    return indices[:k]
+
+
+def constrained_values(constraint, rng, count, lo, hi, generator=None):
+    """
+    `count` ints from lo..hi under a value constraint ("permutation" ignores the
+    range and gives 1..count). A NumPy `generator` draws the same distribution
+    in bulk, but sparse ranges still sample in O(count) memory with the Python
+    samplers. The plan checks feasibility, so count never exceeds the range here.
+    """
+    if constraint == "permutation":
+        if generator is not None:
+            return (generator.permutation(count) + 1).tolist()
+        values = list(range(1, count + 1))
+        _shuffle(rng, values)
+        return values
+    # A uniform non-decreasing sequence is a multiset: count distinct slots of
+    # size + count - 1 ("stars and bars"), each minus its rank
+    total = hi - lo + 1 + (count - 1 if constraint == "sorted" else 0)
+    if generator is not None and total <= INT64_MAX:
+        if total <= 4 * count:
+            # Generator.choice permutes the whole range, which is O(count) only when it is dense
+            indices = generator.choice(total, count, replace=False)
+        else:
+            indices = _np_sample_indices(generator, total, count)
+        if constraint != "distinct":
+            indices.sort()
+            if constraint == "sorted":
+                indices -= np.arange(count)
+        return (indices + lo).tolist()
+    if constraint == "distinct":
+        return [lo + index for block in _chunks(_sample_indices(rng, total, count)) for index in block]
+    indices = sorted_sample(rng, total, count)
+    if constraint == "sorted":
+        offsets = itertools.count(lo, -1)
+        return [index + offset for block in _chunks(indices) for index, offset in zip(block, offsets)]
+    return [lo + index for block in _chunks(indices) for index in block]
+
+
+class GenerationPlan:
+    """A validated spec compiled into a fast per-case generation routine."""
+
+    def __init__(self, spec):
+        self.spec = spec
+        if spec.num_cases is not None and (not isinstance(spec.num_cases, int) or spec.num_cases <= 0):
+            raise SpecError("Number of test cases 't' must be positive.")
+        if spec.input_type not in INPUT_TYPES:
+            raise SpecError(f"Unknown input structure: {spec.input_type}")
+
+        self.var_ranges = tuple((name,) + _check_range((lo, hi), name) for name, lo, hi in spec.variables)
+        ranges = {name: (lo, hi) for name, lo, hi in self.var_ranges}
+        self.value_range = _check_range(spec.value_range, "Value Range")
+
+        input_type = spec.input_type
+        if input_type in ("list_nums", "string_n", "matrix", "tree", "graph", "dag"):
+            needed = ("n",) if input_type in ("list_nums", "string_n", "tree") else ("n", "m")
+            for name in needed:
+                if name not in ranges:
+                    raise SpecError(f"Cannot generate '{INPUT_TYPES[input_type]}' because '{name}' is not selected.")
+                if ranges[name][0] < 0:
+                    raise SpecError(f"Cannot generate '{INPUT_TYPES[input_type]}' for negative {name.upper()} (min {ranges[name][0]}).")
+        if input_type in ("tree", "graph", "dag"):
+            if ranges["n"][0] < 1:
+                raise SpecError(f"Cannot generate '{INPUT_TYPES[input_type]}' with fewer than 1 node (n min {ranges['n'][0]}).")
+            if spec.tree_shape not in TREE_SHAPES:
+                raise SpecError(f"Unknown tree shape: {spec.tree_shape} (expected one of {', '.join(TREE_SHAPES)})")
+        if input_type in ("string_n", "string_single"):
+            tokens = resolve_char_pool(spec.char_set, spec.custom_chars)
+            words = isinstance(tokens, tuple)
+            weights = None
+            if spec.char_weights is not None:
+                weights = _check_weights(spec.char_weights, len(tokens), "word" if words else "character")
+                if spec.distribution not in SAMPLED_STRING_DISTRIBUTIONS or spec.constraint != "none":
+                    raise SpecError(f"Character weights apply to the {', '.join(SAMPLED_STRING_DISTRIBUTIONS)} "
+                                    f"distributions without a constraint.")
+            if words and spec.distribution not in SAMPLED_STRING_DISTRIBUTIONS:
+                raise SpecError(f"Word strings support the {', '.join(SAMPLED_STRING_DISTRIBUTIONS)} distributions, "
+                                f"not '{spec.distribution}'.")
+            self.char_pool = CharPool(tokens, weights, " " if words else "",
+                                      np is not None and spec.backend != "python")
+        elif spec.char_weights is not None:
+            raise SpecError(f"'{INPUT_TYPES[input_type]}' has no characters to weight.")
+        if input_type == "string_single":
+            self.str_len_range = _check_range(spec.str_len_range, "String Length")
+            if self.str_len_range[0] < 0:
+                raise SpecError(f"Cannot generate string for negative length ({self.str_len_range[0]}).")
+        if input_type == "fixed_vars" and not spec.fixed_var_names:
+            raise SpecError("Variable names cannot be empty for 'Fixed Variables'.")
+
+        self.query_count_range = None
+        if spec.query_count_range is not None:
+            self.query_count_range = _check_range(spec.query_count_range, "Number of Queries (Q)")
+            if self.query_count_range[0] < 0:
+                raise SpecError(f"Cannot generate negative number of queries ({self.query_count_range[0]}).")
+            self.query_value_range = _check_range(spec.query_value_range, "Query Val Range")
+            template = spec.query_template if spec.query_template is not None else "{} {}"
+            self._query_alternatives = parse_query_template(template, [name for name, _, _ in self.var_ranges],
+                                                            self.query_value_range)
+            weights = [weight for weight, _, _ in self._query_alternatives]
+            self._query_cum_weights = list(itertools.accumulate(weights))
+            self._query_probabilities = [weight / sum(weights) for weight in weights]
+            constants = [value for _, _, slots in self._query_alternatives for _, lo, hi, _ in slots
+                         for _, value in (lo, hi)]
+            constants += [value for _, lo, hi in self.var_ranges for value in (lo, hi)] + list(self.query_count_range)
+            # NumPy draws need every bound (plus offsets) to stay well inside int64
+            self._queries_fit_int64 = all(abs(value) < 1 << 62 for value in constants)
+
+        table = distributions_for(input_type)
+        if table is not None:
+            if spec.distribution not in table:
+                raise SpecError(f"Distribution '{spec.distribution}' is not available for '{INPUT_TYPES[input_type]}' "
+                                f"(expected one of {', '.join(table)}).")
+            self._preset = table[spec.distribution][1]
+        elif spec.distribution != "uniform":
+            raise SpecError(f"'{INPUT_TYPES[input_type]}' has no data to apply distribution '{spec.distribution}' to.")
+        else:
+            self._preset = None
+        if spec.distribution == "anti_hash":
+            lo, hi = self.value_range
+            if hi // ANTI_HASH_PRIME < -(-lo // ANTI_HASH_PRIME):
+                raise SpecError(f"Value range {lo}..{hi} contains no multiple of {ANTI_HASH_PRIME} for the anti-hash distribution.")
+        if spec.distribution == "brackets":
+            if len(self.char_pool) % 2:
+                raise SpecError("Balanced brackets need the character set to list (opening, closing) pairs, e.g. custom '()[]'.")
+            lo, hi = self.str_len_range if input_type == "string_single" else ranges["n"]
+            if lo == hi and lo % 2:
+                raise SpecError(f"Balanced brackets need an even length ({lo} is odd).")
+            if spec.n_budget is not None and input_type == "string_n":
+                raise SpecError("Balanced brackets cannot be combined with a sum-of-n budget (n must stay even).")
+
+        self.constraint = spec.constraint
+        if input_type in ("string_n", "string_single"):
+            alphabet = sorted(set(self.char_pool))
+            self.constraint_alphabet = tuple(alphabet) if self.char_pool.separator else "".join(alphabet)
+        if spec.constraint != "none":
+            allowed = constraints_for(input_type)
+            if allowed is None or spec.constraint not in allowed:
+                raise SpecError(f"Constraint '{spec.constraint}' is not available for '{INPUT_TYPES[input_type]}'"
+                                + (f" (expected one of {', '.join(allowed)})." if allowed else "."))
+            if spec.distribution != "uniform":
+                raise SpecError(f"Constraint '{spec.constraint}' cannot be combined with distribution '{spec.distribution}'.")
+            if spec.constraint in ("distinct", "increasing"):
+                # Fail fast: the largest count the ranges allow must fit in the domain
+                if input_type in ("string_n", "string_single"):
+                    count = self.str_len_range[1] if input_type == "string_single" else ranges["n"][1]
+                    size = len(self.constraint_alphabet)
+                    domain = "words" if self.char_pool.separator else "characters"
+                else:
+                    count = ranges["n"][1] * (ranges["m"][1] if input_type == "matrix" else 1)
+                    size, domain = self.value_range[1] - self.value_range[0] + 1, f"values in {self.value_range[0]}..{self.value_range[1]}"
+                if count > size:
+                    raise SpecError(f"Cannot draw {count:,} distinct {domain} (only {size:,} exist); "
+                                    f"lower the maximum size or widen the range.")
+
+        self.n_budget = spec.n_budget
+        if spec.n_budget is not None:
+            if "n" not in ranges:
+                raise SpecError("The sum-of-n budget needs 'n' to be selected.")
+            if spec.budget_split not in BUDGET_SPLITS:
+                raise SpecError(f"Unknown budget split: {spec.budget_split} (expected one of {', '.join(BUDGET_SPLITS)})")
+            num_cases = spec.num_cases or 1
+            n_lo, n_hi = ranges["n"]
+            if n_lo < 0:
+                raise SpecError(f"The sum-of-n budget needs n min >= 0 (got {n_lo}).")
+            if num_cases * n_lo > spec.n_budget:
+                raise SpecError(f"Sum of n budget ({spec.n_budget}) is smaller than t * n min ({num_cases * n_lo}).")
+            if num_cases * n_hi < spec.n_budget:
+                raise SpecError(f"Sum of n budget ({spec.n_budget}) cannot be reached: t * n max is only {num_cases * n_hi}.")
+        self._budget_cache = (None, None)
+
+        if spec.backend not in BACKENDS:
+            raise SpecError(f"Unknown backend: {spec.backend} (expected one of {', '.join(BACKENDS)})")
+        fits_int64 = INT64_MIN <= self.value_range[0] and self.value_range[1] <= INT64_MAX
+        if spec.backend == "numpy":
+            if np is None:
+                raise SpecError("The 'numpy' backend was requested but NumPy is not installed.")
+            if not fits_int64:
+                raise SpecError("The 'numpy' backend only supports value ranges within 64-bit integers.")
+        self.use_numpy = np is not None and spec.backend != "python" and fits_int64
+
+        self._emit_body = getattr(self, f"_body_{input_type}")
+        self._adjust_vars = getattr(self, f"_adjust_{input_type}", None)
+        if spec.distribution == "brackets" and input_type == "string_n":
+            self._adjust_vars = self._adjust_even_n
+
+    # --- Per-structure emitters: yield text chunks, every line ends with '\n' ---
+    def _int_line(self, rng, count, lo, hi, values=None):
+        """
+        Yields one line of `count` random ints, CHUNK_ITEMS at a time. `values`
+        is an iterator to take the numbers from instead (stress distributions).
+        """
+        if values is not None:
+            sep = ""
+            for start in range(0, count, CHUNK_ITEMS):
+                yield sep + format_ints(list(itertools.islice(values, min(CHUNK_ITEMS, count - start))))
+                sep = " "
+            yield "\n"
+            return
+        if self.use_numpy and count >= NUMPY_MIN_ITEMS:
+            yield from self._np_int_line(rng, count, lo, hi)
+            return
+        randint = rng.randint
+        sep = ""
+        for start in range(0, count, CHUNK_ITEMS):
+            yield sep + format_ints([randint(lo, hi) for _ in range(min(CHUNK_ITEMS, count - start))])
+            sep = " "
+        yield "\n"
+
+    def _np_int_line(self, rng, count, lo, hi):
+        """NumPy version of _int_line: draws each chunk as one array and formats it in bulk."""
+        integers = np.random.default_rng(rng.getrandbits(64)).integers
+        sep = ""
+        for start in range(0, count, CHUNK_ITEMS):
+            values = integers(lo, hi, size=min(CHUNK_ITEMS, count - start), dtype=np.int64, endpoint=True)
+            yield sep + format_ints(values.tolist())
+            sep = " "
+        yield "\n"
+
+    def _char_line(self, rng, length):
+        """Yields one line of `length` random characters, CHUNK_ITEMS at a time."""
+        if self.constraint != "none":
+            # Constrained characters are constrained indices into the sorted alphabet
+            alphabet = self.constraint_alphabet
+            indices = constrained_values(self.constraint, rng, length, 0, len(alphabet) - 1,
+                                         self._constraint_generator(rng, length))
+            yield from self.char_pool.text(list(map(alphabet.__getitem__, indices[start:start + CHUNK_ITEMS]))
+                                           for start in range(0, length, CHUNK_ITEMS))
+            yield "\n"
+            return
+        if self._preset is not None:
+            yield from self._preset(rng, length, self.char_pool)
+            yield "\n"
+            return
+        draw = self.char_pool.draw
+        yield from self.char_pool.text(draw(rng, min(CHUNK_ITEMS, length - start))
+                                       for start in range(0, length, CHUNK_ITEMS))
+        yield "\n"
+
+    def _body_none(self, rng, vars_generated):
+        return ()
+
+    def _constraint_generator(self, rng, count):
+        """NumPy generator for constrained_values when the backend uses NumPy for `count` values, else None."""
+        if self.use_numpy and count >= NUMPY_MIN_ITEMS:
+            return np.random.default_rng(rng.getrandbits(64))
+        return None
+
+    def _preset_values(self, rng, count):
+        """Iterator over `count` numbers from the stress distribution or value constraint, or None for uniform."""
+        if self.constraint != "none":
+            return iter(constrained_values(self.constraint, rng, count, *self.value_range,
+                                           self._constraint_generator(rng, count)))
+        return self._preset and self._preset(rng, count, *self.value_range)
+
+    def _body_list_nums(self, rng, vars_generated):
+        n = vars_generated["n"]
+        return self._int_line(rng, n, *self.value_range, self._preset_values(rng, n))
+
+    def _body_string_n(self, rng, vars_generated):
+        return self._char_line(rng, vars_generated["n"])
+
+    def _body_string_single(self, rng, vars_generated):
+        length = rng.randint(*self.str_len_range)
+        if self.spec.distribution == "brackets" and length % 2:
+            length += 1 if length < self.str_len_range[1] else -1
+        return self._char_line(rng, length)
+
+    def _body_matrix(self, rng, vars_generated):
+        lo, hi = self.value_range
+        n, m = vars_generated["n"], vars_generated["m"]
+        values = self._preset_values(rng, n * m) # Presets run over the matrix in row-major order
+        if m == 0:
+            yield "\n" * n
+            return
+        if m > CHUNK_ITEMS: # Rows longer than a chunk are split inside the row
+            for _ in range(n):
+                yield from self._int_line(rng, m, lo, hi, values)
             return
+        # Draw and format whole blocks of rows at once
+        integers = None
+        if values is None and self.use_numpy and n * m >= NUMPY_MIN_ITEMS:
+            integers = np.random.default_rng(rng.getrandbits(64)).integers
+        randint = rng.randint
+        rows_per_block = CHUNK_ITEMS // m
+        for start in range(0, n, rows_per_block):
+            count = min(rows_per_block, n - start) * m
+            if integers is not None:
+                block = integers(lo, hi, size=count, dtype=np.int64, endpoint=True).tolist()
+            elif values is not None:
+                block = list(itertools.islice(values, count))
+            else:
+                block = [randint(lo, hi) for _ in range(count)]
+            yield format_int_rows(block, m)
+
+    def _body_fixed_vars(self, rng, vars_generated):
+        count = len(self.spec.fixed_var_names)
+        return self._int_line(rng, count, *self.value_range, self._preset_values(rng, count))
+
+    def _adjust_graph(self, vars_generated):
+        # Clamp m to what a connected simple graph on the drawn n can have
+        n = vars_generated["n"]
+        vars_generated["m"] = min(max(vars_generated["m"], n - 1), n * (n - 1) // 2)
+
+    def _adjust_even_n(self, vars_generated):
+        # Balanced brackets: an odd n moves to a neighbour inside its range
+        n = vars_generated["n"]
+        if n % 2:
+            vars_generated["n"] = n + 1 if n == next(lo for name, lo, _ in self.var_ranges if name == "n") else n - 1
+
+    def _adjust_dag(self, vars_generated):
+        n = vars_generated["n"]
+        vars_generated["m"] = min(vars_generated["m"], n * (n - 1) // 2)
+
+    def _edge_lines(self, rng, n, edges, directed=False):
+        """Relabels nodes with a random permutation of 1..n, shuffles and formats the edges."""
+        if self.use_numpy and n >= NUMPY_MIN_ITEMS:
+            generator = np.random.default_rng(rng.getrandbits(64))
+            labels = (generator.permutation(n) + 1).tolist()
+            edges = [edges[i] for block in _chunks(generator.permutation(len(edges)).tolist()) for i in block]
+        else:
+            labels = list(range(1, n + 1))
+            _shuffle(rng, labels)
+            _shuffle(rng, edges)
+        random_ = rng.random
+        if not directed:
+            # Random orientation, applied through the label lookup
+            edges = [(labels[v], labels[u]) if random_() < 0.5 else (labels[u], labels[v])
+                     for block in _chunks(edges) for u, v in block]
+        else:
+            edges = [(labels[u], labels[v]) for block in _chunks(edges) for u, v in block]
+        for start in range(0, len(edges), CHUNK_ITEMS):
+            block = edges[start:start + CHUNK_ITEMS]
+            ends = list(itertools.chain.from_iterable(block))
+            if self.spec.weighted_edges:
+                flat = [0] * (3 * len(block))
+                flat[0::3], flat[1::3], flat[2::3] = ends[0::2], ends[1::2], self._weights(rng, len(block))
+                yield format_int_rows(flat, 3)
+            else:
+                yield format_int_rows(ends, 2)
+
+    def _weights(self, rng, count):
+        """`count` uniform edge weights from the value range."""
+        lo, hi = self.value_range
+        if self.use_numpy:
+            return np.random.default_rng(rng.getrandbits(64)).integers(lo, hi, size=count, endpoint=True).tolist()
+        randint = rng.randint
+        return [randint(lo, hi) for _ in range(count)]
+
+    def _body_tree(self, rng, vars_generated):
+        n = vars_generated["n"]
+        return self._edge_lines(rng, n, tree_edges(rng, n, self.spec.tree_shape))
+
+    def _body_graph(self, rng, vars_generated):
+        n = vars_generated["n"]
+        return self._edge_lines(rng, n, graph_edges(rng, n, vars_generated["m"], self.spec.tree_shape))
+
+    def _body_dag(self, rng, vars_generated):
+        n = vars_generated["n"]
+        return self._edge_lines(rng, n, dag_edges(rng, n, vars_generated["m"]), directed=True)
+
+    def _queries(self, rng, vars_generated):
+        """Yields Q, then Q lines from the query template, drawn and joined CHUNK_ITEMS queries at a time."""
+        q_count = rng.randint(*self.query_count_range)
+        yield f"{q_count}\n"
+        scope = dict(vars_generated, q=q_count)
+        alternatives = self._query_alternatives
+        generator = None
+        if self.use_numpy and self._queries_fit_int64 and q_count >= NUMPY_MIN_ITEMS:
+            generator = np.random.default_rng(rng.getrandbits(64))
+        for start in range(0, q_count, CHUNK_ITEMS):
+            count = min(CHUNK_ITEMS, q_count - start)
+            if len(alternatives) == 1:
+                # One format call for the whole block
+                _, line_format, slots = alternatives[0]
+                columns = self._query_columns(rng, generator, alternatives[0], count, scope)
+                yield format_query_block(line_format, count, columns)
+                continue
+            # Pick every query's type at once, draw each type's lines as one batch, then interleave
+            if generator is not None:
+                kinds = generator.choice(len(alternatives), size=count, p=self._query_probabilities).tolist()
+            else:
+                kinds = rng.choices(range(len(alternatives)), cum_weights=self._query_cum_weights, k=count)
+            counts = collections.Counter(kinds)
+            lines = []
+            for kind, alternative in enumerate(alternatives):
+                line_format, slots = alternative[1], alternative[2]
+                columns = self._query_columns(rng, generator, alternative, counts[kind], scope)
+                lines.append(map(line_format.__mod__, zip(*columns)) if slots
+                             else itertools.repeat(line_format, counts[kind]))
+            yield join_interleaved(lines, kinds)
+
+    def _query_columns(self, rng, generator, alternative, count, scope):
+        """The `count` values of every slot of one template alternative, drawn column by column."""
+        slots = alternative[2]
+        named = {}
+        columns = []
+        for name, lo, hi, source in slots:
+            column = self._query_column(rng, generator, count, self._query_bound(lo, scope, named),
+                                        self._query_bound(hi, scope, named), source)
+            if name:
+                named[name] = column
+            columns.append(column.tolist() if generator is not None else column)
+        return columns
+
+    @staticmethod
+    def _query_bound(bound, scope, named):
+        """A slot bound as a number, or as one number per query when it refers to an earlier slot."""
+        name, offset = bound
+        if name is None:
+            return offset
+        if name in named:
+            column = named[name]
+            if not offset:
+                return column
+            return column + offset if not isinstance(column, list) else [value + offset for value in column]
+        return scope[name] + offset
+
+    @staticmethod
+    def _query_column(rng, generator, count, lo, hi, source):
+        """`count` uniform ints in [lo, hi]; either bound may be a per-query list (or array)."""
+        if generator is not None:
+            if np.any(np.asarray(hi) < np.asarray(lo)):
+                raise SpecError(f"Query template slot {source} has an empty range for this case.")
+            return generator.integers(lo, hi, size=count, dtype=np.int64, endpoint=True)
+        random_ = rng.random
+        if not isinstance(lo, list) and not isinstance(hi, list):
+            if hi < lo:
+                raise SpecError(f"Query template slot {source} has an empty range ({lo}..{hi}) for this case.")
+            if hi - lo < 1 << 53:
+                span = hi - lo + 1
+                return [lo + int(random_() * span) for _ in range(count)]
+            randint = rng.randint
+            return [randint(lo, hi) for _ in range(count)]
+        los = lo if isinstance(lo, list) else itertools.repeat(lo, count)
+        his = hi if isinstance(hi, list) else itertools.repeat(hi, count)
+        bounds = list(zip(los, his))
+        if any(high < low for low, high in bounds):
+            raise SpecError(f"Query template slot {source} has an empty range for this case.")
+        if all(high - low < 1 << 53 for low, high in bounds):
+            return [low + int(random_() * (high - low + 1)) for low, high in bounds]
+        randint = rng.randint
+        return [randint(low, high) for low, high in bounds]
+
+    def iter_case_chunks(self, rng=random, overrides=None, timer=None):
+        """
+        Yields the text of one test case in bounded-size chunks. `overrides` fixes
+        variables, e.g. {"n": 5}; a StageTimer `timer` gets the time spent in the
+        main structure ("body:<input type>") and in the queries.
+        """
+        vars_generated = {}
 
+        # 1. n, m, k
+        if self.var_ranges:
+            for name, lo, hi in self.var_ranges:
+                if overrides and name in overrides:
+                    vars_generated[name] = overrides[name]
+                else:
+                    vars_generated[name] = rng.randint(lo, hi)
+            if self._adjust_vars is not None:
+                self._adjust_vars(vars_generated)
+            yield " ".join(str(vars_generated[name]) for name, _, _ in self.var_ranges) + "\n"
+
+        # 2. Main structure
+        if timer is None:
+            yield from self._emit_body(rng, vars_generated)
+        else:
+            yield from timer.timed_chunks(f"body:{self.spec.input_type}",
+                                          functools.partial(self._emit_body, rng, vars_generated))
+
+        # 3. Queries
+        if self.query_count_range is not None:
+            if timer is None:
+                yield from self._queries(rng, vars_generated)
+            else:
+                yield from timer.timed_chunks("queries", functools.partial(self._queries, rng, vars_generated))
+
+    def max_case_items(self):
+        """Upper bound on the numbers/characters in one test case, from the spec's ranges."""
+        ranges = {name: hi for name, _, hi in self.var_ranges}
+        n, m = max(ranges.get("n", 0), 0), max(ranges.get("m", 0), 0)
+        items = len(self.var_ranges) + {
+            "list_nums": n,
+            "string_n": n,
+            "string_single": self.str_len_range[1] if self.spec.input_type == "string_single" else 0,
+            "matrix": n * m,
+            "fixed_vars": len(self.spec.fixed_var_names),
+            "tree": 3 * n,
+            "graph": 3 * m,
+            "dag": 3 * m,
+        }.get(self.spec.input_type, 0)
+        if self.query_count_range is not None:
+            per_query = max(line_format.count(" ") + 1 for _, line_format, _ in self._query_alternatives)
+            items += 1 + per_query * self.query_count_range[1]
+        return items
+
+    def cases_per_task(self):
+        """How many consecutive cases one parallel task renders."""
+        return max(1, min(self.spec.num_cases or 1, TASK_ITEMS // max(self.max_case_items(), 1)))
+
+    def num_tasks(self):
+        per_task = self.cases_per_task()
+        return -(-(self.spec.num_cases or 1) // per_task)
+
+    def budget_sizes(self, master_seed):
+        """The n of every case in the suite of `master_seed` under the sum-of-n budget (cached)."""
+        cached_seed, sizes = self._budget_cache
+        if cached_seed != master_seed or sizes is None:
+            sizes = self._split_budget(random.Random(derive_seed(master_seed, "n_budget")))
+            self._budget_cache = (master_seed, sizes)
+        return sizes
+
+    def _split_budget(self, rng):
+        n_lo, n_hi = next((lo, hi) for name, lo, hi in self.var_ranges if name == "n")
+        return split_budget(self.n_budget, self.spec.num_cases or 1, n_lo, n_hi, self.spec.budget_split, rng)
+
+    def iter_seeded_case(self, rng, master_seed, case_index, timer=None):
+        """Reseeds `rng` for case `case_index` of the suite of `master_seed` and yields that case's chunks."""
+        rng.seed(derive_seed(master_seed, case_index))
+        overrides = None
+        if self.n_budget is not None:
+            overrides = {"n": self.budget_sizes(master_seed)[case_index]}
+        return self.iter_case_chunks(rng, overrides, timer)
+
+    def render_task(self, master_seed, task_index):
+        """Returns the text of parallel task `task_index` (a run of cases_per_task() cases)."""
+        per_task = self.cases_per_task()
+        first = task_index * per_task
+        last = min(first + per_task, self.spec.num_cases or 1)
+        rng = random.Random()
+        parts = []
+        for case_index in range(first, last):
+            parts.extend(self.iter_seeded_case(rng, master_seed, case_index))
+        return "".join(parts)
+
+    def generate_case_at(self, master_seed, case_index):
+        """
+        Returns the text of case `case_index` (0-based) of the suite generated from
+        `master_seed`, without generating the cases before it. (With a sum-of-n
+        budget the O(t) split is computed first.)
+        """
+        num_cases = self.spec.num_cases or 1
+        if not 0 <= case_index < num_cases:
+            raise SpecError(f"Test case #{case_index + 1} does not exist (t = {num_cases}).")
+        return "".join(self.iter_seeded_case(random.Random(), master_seed, case_index)).rstrip("\n")
+
+    def generate_case(self, rng=random):
+        """Returns the text of a single test case (without trailing newline)."""
+        return "".join(self.iter_case_chunks(rng)).rstrip("\n")
+
+    def iter_chunks(self, rng=random):
+        """Yields the complete output, including the leading 't' line, chunk by chunk."""
+        if self.spec.num_cases is not None:
+            yield f"{self.spec.num_cases}\n"
+        sizes = self._split_budget(rng) if self.n_budget is not None else None
+        for case_index in range(self.spec.num_cases or 1):
+            yield from self.iter_case_chunks(rng, sizes and {"n": sizes[case_index]})
+
+    def generate(self, rng=random):
+        """Returns the complete output as one string (small outputs only)."""
+        return "".join(self.iter_chunks(rng))
+
+
+# Compiled plans of recently used specs, most recent last
+_plan_cache = collections.OrderedDict()
+_plan_cache_lock = threading.Lock()
+
+
+def compile_spec(spec):
+    """
+    Validates a GenerationSpec once and returns its GenerationPlan. Specs are
+    frozen and hashable, so plans are cached by spec: compiling the same spec
+    again (the next GUI run, every task of a batch) skips validation and setup.
+    """
+    try:
+        hash(spec)
+    except TypeError: # Hand-built spec with lists inside; compile without caching
+        return GenerationPlan(spec)
+    with _plan_cache_lock:
+        plan = _plan_cache.get(spec)
+        if plan is not None:
+            _plan_cache.move_to_end(spec)
+            return plan
+    plan = GenerationPlan(spec)
+    with _plan_cache_lock:
+        _plan_cache[spec] = plan
+        if len(_plan_cache) > PLAN_CACHE_SIZE:
+            _plan_cache.popitem(last=False)
+    return plan
+
+
+def derive_seed(master_seed, index):
+    """Deterministic 64-bit seed of test case `index` in the suite of `master_seed`."""
+    digest = hashlib.blake2b(f"{master_seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def split_budget(total, count, lo, hi, mode, rng=random):
+    """
+    Splits `total` into `count` sizes within [lo, hi] that sum to exactly `total`,
+    in O(count). Modes: "random" (uniform random composition, capped at hi),
+    "even" (sizes differ by at most one) and "one_max" (as many hi-sized cases as
+    fit, one remainder case, the rest lo), shuffled into random positions.
+    """
+    extra = total - count * lo
+    if extra < 0 or extra > count * (hi - lo):
+        raise SpecError(f"Cannot split {total} into {count} sizes between {lo} and {hi}.")
+    cap = hi - lo
+    if mode == "even":
+        base, remainder = divmod(extra, count)
+        sizes = [lo + base] * count
+        for index in rng.sample(range(count), remainder):
+            sizes[index] += 1
+        return sizes
+    if mode == "one_max":
+        full, remainder = divmod(extra, cap) if cap else (0, 0)
+        sizes = [hi] * full + ([lo + remainder] if full < count else []) + [lo] * max(count - full - 1, 0)
+        rng.shuffle(sizes)
+        return sizes
+    if mode != "random":
+        raise SpecError(f"Unknown budget split: {mode}")
+
+    # Dirichlet(1, ..., 1) weights give a uniform random composition; flooring and the
+    # hi cap leave a remainder that one pass from a random offset hands out again
+    weights = [rng.expovariate(1.0) for _ in range(count)]
+    scale = extra / sum(weights)
+    extras = [min(cap, int(weight * scale)) for weight in weights]
+    left = extra - sum(extras)
+    start = rng.randrange(count)
+    for step in range(count):
+        if not left:
+            break
+        index = (start + step) % count
+        add = min(cap - extras[index], left)
+        extras[index] += add
+        left -= add
+    return [lo + e for e in extras]
+
+
+def new_master_seed():
+    """A fresh random master seed, for runs that did not ask for one."""
+    return random.SystemRandom().getrandbits(63)
+
+
+def write_output(plan, out, rng=random, cancel_event=None, on_progress=None, seed=None, case_lines=None,
+                 timer=None):
+    """
+    Streams the plan's output to a text file object; returns characters written.
+    `cancel_event` (a threading.Event) is checked before every chunk, and at the
+    cancel_point()s of long bodies, and raises GenerationCancelled once set; `on_progress(cases_done, chars_written)` is
+    called after every chunk. With a master `seed`, `rng` is ignored and case i
+    is drawn from derive_seed(seed, i), the same as write_output_parallel and
+    GenerationPlan.generate_case_at. If `case_lines` is a list, the 0-based line
+    number where each case starts is appended to it. A StageTimer `timer` is
+    charged with the generation, "format" and "write" time.
+    """
+    if timer is not None and _profiling.timer is not timer:
+        with timer.activate():
+            return write_output(plan, out, rng, cancel_event, on_progress, seed, case_lines, timer)
+    if cancel_event is not None and _cancelling.event is not cancel_event:
+        previous, _cancelling.event = _cancelling.event, cancel_event
+        try:
+            return write_output(plan, out, rng, cancel_event, on_progress, seed, case_lines, timer)
+        finally:
+            _cancelling.event = previous
+    sizes = None
+    if seed is not None:
+        rng = random.Random()
+    elif plan.n_budget is not None:
+        sizes = plan._split_budget(rng)
+    written = 0
+    lines = 0
+    write = out.write if timer is None else timer.timed_call("write", out.write)
+    if plan.spec.num_cases is not None:
+        header = f"{plan.spec.num_cases}\n"
+        write(header)
+        written += len(header)
+        lines += 1
+    for case_index in range(plan.spec.num_cases or 1):
+        if case_lines is not None:
+            case_lines.append(lines)
+        if seed is not None:
+            chunks = plan.iter_seeded_case(rng, seed, case_index, timer)
+        else:
+            chunks = plan.iter_case_chunks(rng, sizes and {"n": sizes[case_index]}, timer)
+        try:
+            for chunk in chunks:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise GenerationCancelled(case_index)
+                write(chunk)
+                written += len(chunk)
+                if case_lines is not None:
+                    lines += chunk.count("\n")
+                if on_progress is not None:
+                    on_progress(case_index, written)
+        except GenerationCancelled as e:
+            if e.args[0] is None: # From a cancel_point() inside the body
+                raise GenerationCancelled(case_index) from None
+            raise
+        if on_progress is not None:
+            on_progress(case_index + 1, written)
+    return written
+
+
+# Plan compiled once per pool worker process by _init_pool_worker
+_pool_plan = None
+
+# cProfile.Profile running under profile_capture, if any
+_active_profiler = None
+
+
+def _init_pool_worker(spec):
+    global _pool_plan
+    # Forked workers inherit profile_capture's tracing, which only the parent reports
+    if _active_profiler is not None:
+        _active_profiler.disable()
+    tracemalloc = sys.modules.get("tracemalloc")
+    if tracemalloc is not None and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _pool_plan = compile_spec(spec)
+
+
+def _render_pool_task(master_seed, task_index):
+    return _pool_plan.render_task(master_seed, task_index)
+
+
+def write_output_parallel(plan, out, seed, jobs, cancel_event=None, on_progress=None, timer=None):
+    """
+    Like write_output with a master seed, but renders runs of cases on `jobs`
+    processes. Results are written in task order, and at most 2 * jobs tasks are
+    in flight, so memory stays bounded. Output does not depend on `jobs`. A
+    StageTimer `timer` sees the generation only as "workers" (time spent
+    waiting for the next result) next to "write".
+    """
+    import concurrent.futures
+    written = 0
+    write = out.write if timer is None else timer.timed_call("write", out.write)
+    if plan.spec.num_cases is not None:
+        header = f"{plan.spec.num_cases}\n"
+        write(header)
+        written += len(header)
+
+    num_cases = plan.spec.num_cases or 1
+    per_task = plan.cases_per_task()
+    tasks = iter(range(plan.num_tasks()))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=_init_pool_worker,
+                                                initargs=(plan.spec,)) as pool:
+        in_flight = collections.deque(pool.submit(_render_pool_task, seed, task)
+                                      for task in itertools.islice(tasks, 2 * jobs))
+        task_index = 0
+        while in_flight:
+            if timer is None:
+                text = in_flight.popleft().result()
+            else:
+                with timer.measure("workers"):
+                    text = in_flight.popleft().result()
+            if cancel_event is not None and cancel_event.is_set():
+                for future in in_flight:
+                    future.cancel()
+                raise GenerationCancelled(task_index * per_task)
+            write(text)
+            written += len(text)
+            task_index += 1
+            if on_progress is not None:
+                on_progress(min(task_index * per_task, num_cases), written)
+            for task in itertools.islice(tasks, 1):
+                in_flight.append(pool.submit(_render_pool_task, seed, task))
+    return written
+
+
+class LineIndex:
+    """
+    Random access to the lines of a (possibly huge) text file through mmap. The
+    index keeps only the newline count of every INDEX_BLOCK bytes, so it is built
+    at bytes.count speed in O(size / INDEX_BLOCK) memory; a line is located by
+    bisecting the blocks and scanning inside one block.
+    """
+
+    def __init__(self, path):
+        self.size = os.path.getsize(path)
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        newlines_before = [0] # newlines_before[b]: newlines in the blocks before block b
+        for start in range(0, self.size, INDEX_BLOCK):
+            newlines_before.append(newlines_before[-1] + self._map[start:start + INDEX_BLOCK].count(b"\n"))
+        self._newlines_before = newlines_before
+        unterminated = self.size and self._map[self.size - 1:self.size] != b"\n"
+        self.line_count = newlines_before[-1] + (1 if unterminated else 0)
+
+    def line_start(self, line):
+        """Byte offset where line `line` (0-based) starts, i.e. just after the line-th newline."""
+        if line <= 0:
+            return 0
+        block = bisect.bisect_left(self._newlines_before, line) - 1
+        position = block * INDEX_BLOCK - 1
+        for _ in range(line - self._newlines_before[block]):
+            position = self._map.find(b"\n", position + 1)
+        return position + 1
+
+    def lines(self, first, count, max_chars=VIEW_LINE_CHARS):
+        """Up to `count` lines starting at `first`, decoded and cut to `max_chars` characters."""
+        result = []
+        position = self.line_start(first)
+        for _ in range(max(0, min(count, self.line_count - first))):
+            end = self._map.find(b"\n", position)
+            if end < 0:
+                end = self.size
+            length = end - position
+            text = self._map[position:position + min(length, max_chars)].decode("utf-8", errors="replace")
+            if length > max_chars:
+                text += f" ... (+{format_size(length - max_chars)} on this line)"
+            result.append(text)
+            position = end + 1
+        return result
+
+    def close(self):
+        if self.size:
+            self._map.close()
+        self._file.close()
+
+
+def format_size(num_bytes):
+    """Formats a byte count for status messages, e.g. '12.3 MB'."""
+    for unit in ("B", "KB", "MB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+
+# --- Stress testing (reference vs. candidate over pipes) ---
+
+@dataclass
+class RunResult:
+    """Outcome of feeding one input to one program."""
+    output: bytes
+    errors: bytes
+    returncode: int                      # None when the program was killed for taking too long
+    seconds: float
+
+
+@dataclass
+class StressRun:
+    """One stress iteration: its input and how both programs did on it."""
+    index: int
+    seed: int                            # Master seed of the input, as accepted by `gen --seed`
+    data: bytes
+    ref: RunResult
+    sol: RunResult
+    verdict: str                         # None if the solution passed
+
+
+def parse_command(command):
+    """Splits a command line such as 'python3 brute.py' into an argv list."""
+    argv = shlex.split(command)
+    if not argv:
+        raise SpecError("Program command cannot be empty.")
+    return argv
+
+
+def run_program(argv, data, timeout=None):
+    """Runs `argv` with `data` on stdin and captures its output through pipes (no temp files)."""
+    import subprocess
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(argv, input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+    except subprocess.TimeoutExpired as e:
+        return RunResult(e.stdout or b"", e.stderr or b"", None, time.perf_counter() - start)
+    except OSError as e:
+        raise SpecError(f"Cannot run '{shlex.join(argv)}': {e}")
+    return RunResult(proc.stdout, proc.stderr, proc.returncode, time.perf_counter() - start)
+
+
+def stress_verdict(ref, sol, time_limit=None):
+    """Why a stress iteration failed, or None. Outputs are compared token by token like a default checker."""
+    if ref.returncode != 0:
+        return "reference failed" if ref.returncode is not None else "reference timed out"
+    if sol.returncode is None or (time_limit is not None and sol.seconds > time_limit):
+        return "time limit exceeded"
+    if sol.returncode != 0:
+        return f"runtime error (exit code {sol.returncode})"
+    if ref.output.split() != sol.output.split():
+        return "wrong answer"
+    return None
+
+
+def stress_run(plan, ref_argv, sol_argv, index, seed, time_limit=None):
+    """Generates the input of master seed `seed` and runs both programs on it."""
+    buffer = io.StringIO()
+    write_output(plan, buffer, seed=seed)
+    data = buffer.getvalue().encode()
+    # Slow programs are killed at twice the limit, so a TLE still shows how slow it was
+    timeout = 2 * time_limit if time_limit is not None else None
+    ref = run_program(ref_argv, data, timeout)
+    sol = run_program(sol_argv, data, timeout)
+    return StressRun(index, seed, data, ref, sol, stress_verdict(ref, sol, time_limit))
+
+
+def stress_test(plan, ref_argv, sol_argv, seed, jobs=1, runs=None, time_limit=None, on_run=None):
+    """
+    Runs stress iterations on `jobs` threads until the first failure, or until
+    `runs` iterations passed (runs=None: no limit). Iteration i draws its input
+    from master seed derive_seed(seed, i). After a failure no new iterations
+    start; the ones in flight finish, and the failing run with the smallest
+    input is returned (None if every run passed). `on_run(run)` is called for
+    every finished iteration.
+    """
+    import concurrent.futures
+    indices = iter(range(runs)) if runs is not None else itertools.count()
+    failures = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        def submit(index):
+            return pool.submit(stress_run, plan, ref_argv, sol_argv, index, derive_seed(seed, index), time_limit)
+
+        pending = {submit(index) for index in itertools.islice(indices, jobs)}
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                run = future.result()
+                if on_run is not None:
+                    on_run(run)
+                if run.verdict is not None:
+                    failures.append(run)
+            if not failures:
+                pending |= {submit(index) for index in itertools.islice(indices, len(done))}
+    return min(failures, key=lambda run: (len(run.data), run.index), default=None)
+
+
+# --- Shrinking failing inputs (delta debugging) ---
+
+SHRINKABLE_TYPES = ("none", "list_nums", "string_n", "matrix")
+
+
+@dataclass
+class ParsedCase:
+    """One test case of a parsed input, split into the parts the shrinker changes."""
+    variables: dict                      # name -> value, in spec order
+    body: list                           # list_nums: ints; string_n: characters; matrix: rows of ints; none: []
+    queries: list = None                 # [(a, b), ...]; None when the spec has no queries
+
+
+def parse_input(plan, text):
+    """Splits an input generated from `plan`'s spec back into a list of ParsedCase."""
+    input_type = plan.spec.input_type
+    if input_type not in SHRINKABLE_TYPES:
+        raise SpecError(f"Cannot shrink '{INPUT_TYPES[input_type]}' inputs (supported: {', '.join(SHRINKABLE_TYPES)}).")
+    if plan.spec.query_template is not None:
+        raise SpecError("Cannot shrink inputs whose queries come from a query template.")
+    tokens = text.split()
+    position = 0
+
+    def take(count):
+        nonlocal position
+        if count < 0 or position + count > len(tokens):
+            raise SpecError(f"Input does not match the spec: cannot read {count} more token(s) at token {position + 1}.")
+        position += count
+        return tokens[position - count:position]
+
+    def take_ints(count):
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-                if not content.endswith('\n'):
-                    f.write('\n')
-            # Use status bar for success message
-            self.set_status(f"Successfully saved to {filepath}. Good luck!", "success")
-        except Exception as e:
-            messagebox.showerror("Save Error", f"Failed to save file:\n{e}", parent=self)
-            self.set_status(f"Error saving file: {e}", "error")
+            return [int(token) for token in take(count)]
+        except ValueError as e:
+            raise SpecError(f"Input does not match the spec: {e}")
+
+    cases = []
+    for _ in range(take_ints(1)[0] if plan.spec.num_cases is not None else 1):
+        variables = dict(zip([name for name, _, _ in plan.var_ranges], take_ints(len(plan.var_ranges))))
+        body = []
+        if input_type == "list_nums":
+            body = take_ints(variables["n"])
+        elif input_type == "string_n" and variables["n"] > 0:
+            body = take(variables["n"]) if plan.char_pool.separator else list(take(1)[0])
+            unknown = set(body) - set(plan.char_pool)
+            if unknown:
+                what = "words" if plan.char_pool.separator else "characters"
+                raise SpecError(f"Input does not match the spec: {what} {plan.char_pool.separator.join(sorted(unknown))!r} "
+                                f"are not in the character set.")
+        elif input_type == "matrix":
+            body = [take_ints(variables["m"]) for _ in range(variables["n"])]
+        queries = None
+        if plan.query_count_range is not None:
+            flat = take_ints(2 * take_ints(1)[0])
+            queries = list(zip(flat[::2], flat[1::2]))
+        cases.append(ParsedCase(variables, body, queries))
+    if position != len(tokens):
+        raise SpecError(f"Input does not match the spec: {len(tokens) - position} unexpected token(s) at the end.")
+    return cases
+
+
+def format_input(plan, cases):
+    """Renders ParsedCases back into input text in the generator's layout."""
+    input_type = plan.spec.input_type
+    lines = [str(len(cases))] if plan.spec.num_cases is not None else []
+    for case in cases:
+        if plan.var_ranges:
+            lines.append(" ".join(str(case.variables[name]) for name, _, _ in plan.var_ranges))
+        if input_type == "list_nums":
+            lines.append(" ".join(map(str, case.body)))
+        elif input_type == "string_n":
+            lines.append(plan.char_pool.separator.join(case.body))
+        elif input_type == "matrix":
+            lines.extend(" ".join(map(str, row)) for row in case.body)
+        if case.queries is not None:
+            lines.append(str(len(case.queries)))
+            lines.extend(f"{a} {b}" for a, b in case.queries)
+    return "\n".join(lines) + "\n"
+
+
+def _replace_case(cases, index, **changes):
+    """Copy of `cases` with case `index` changed; the other cases are shared."""
+    cases = list(cases)
+    cases[index] = replace(cases[index], **changes)
+    return cases
+
+
+def _renumber_body(body):
+    """Replaces the values of a list or matrix body by their ranks 1..count, so a permutation stays one after removals."""
+    flat = [value for row in body for value in row] if body and isinstance(body[0], list) else body
+    if not flat:
+        return body # No values left (every column removed), nothing to renumber
+    ranks = [0] * len(flat)
+    for rank, position in enumerate(sorted(range(len(flat)), key=flat.__getitem__), 1):
+        ranks[position] = rank
+    if flat is body:
+        return ranks
+    width = len(body[0])
+    return [ranks[start:start + width] for start in range(0, len(ranks), width)]
+
+
+class Shrinker:
+    """
+    Minimizes a failing input by delta debugging: drops ever smaller chunks of
+    cases, elements, matrix rows/columns and queries (shrinking t, n, m and Q),
+    then lowers values towards the bottom of their ranges (except under a
+    value constraint, which removals preserve), for as long as
+    `still_fails(data)` holds. Candidates are tested `jobs` at a time on a
+    thread pool and memoized by the SHA-256 of their text, so no input is
+    run twice. Sizes never drop below the spec's minimums.
+    """
+
+    def __init__(self, plan, still_fails, jobs=1, on_improve=None):
+        self.plan = plan
+        self.still_fails = still_fails
+        self.jobs = jobs
+        self.on_improve = on_improve
+        self.memo = {}
+        self.tests_run = 0
+        self.cases = None
+        self._pool = None
+
+    def shrink(self, cases):
+        """Returns the smallest failing variant of `cases` found."""
+        import concurrent.futures
+        data = format_input(self.plan, cases).encode()
+        self.tests_run += 1
+        if not self.still_fails(data):
+            raise SpecError("The input does not fail the check, so there is nothing to shrink.")
+        self.memo[hashlib.sha256(data).digest()] = True
+        self.cases = cases
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs) as self._pool:
+            while self._shrink_pass():
+                pass
+        return self.cases
+
+    def _accept(self, cases):
+        self.cases = cases
+        if self.on_improve is not None:
+            self.on_improve(cases)
+
+    def _first_failing(self, candidates):
+        """The first (tag, cases) of `candidates` whose input still fails, or None."""
+        candidates = iter(candidates)
+        while True:
+            batch = []
+            pending = {}
+            for tag, cases in itertools.islice(candidates, self.jobs):
+                data = format_input(self.plan, cases).encode()
+                key = hashlib.sha256(data).digest()
+                batch.append((tag, cases, key))
+                if key not in self.memo and key not in pending:
+                    pending[key] = self._pool.submit(self.still_fails, data)
+            if not batch:
+                return None
+            for key, future in pending.items():
+                self.memo[key] = future.result()
+                self.tests_run += 1
+            for tag, cases, key in batch:
+                if self.memo[key]:
+                    return tag, cases
+
+    def _remove_chunks(self, get, put, min_len):
+        """Removes chunks of the list get(cases), halving the chunk size whenever none can go."""
+        accepted = False
+        items = get(self.cases)
+        size = len(items) - min_len
+        while size > 0:
+            found = self._first_failing((start, put(self.cases, items[:start] + items[start + size:]))
+                                        for start in range(0, len(items) - size + 1, size))
+            if found is None:
+                size //= 2
+                continue
+            self._accept(found[1])
+            accepted = True
+            items = get(self.cases)
+            size = min(size, len(items) - min_len)
+        return accepted
+
+    def _lower_values(self, get, put, lo):
+        """Sets chunks of the ints get(cases) to `lo`, then halves single values' distance to `lo`."""
+        accepted = False
+        values = get(self.cases)
+        size = len(values)
+        while size > 0:
+            found = self._first_failing(
+                (start, put(self.cases, values[:start] + [lo] * len(values[start:start + size]) + values[start + size:]))
+                for start in range(0, len(values), size) if max(values[start:start + size]) > lo)
+            if found is None:
+                size //= 2
+                continue
+            self._accept(found[1])
+            accepted = True
+            values = get(self.cases)
+        start = 0
+        while True:
+            found = self._first_failing(
+                (index, put(self.cases, values[:index] + [lo + (values[index] - lo) // 2] + values[index + 1:]))
+                for index in range(start, len(values)) if values[index] > lo)
+            if found is None:
+                return accepted
+            start, cases = found
+            self._accept(cases)
+            accepted = True
+            values = get(self.cases)
+
+    def _shrink_pass(self):
+        """One round over every part of the input; True if anything got smaller."""
+        plan = self.plan
+        input_type = plan.spec.input_type
+        ranges = {name: (lo, hi) for name, lo, hi in plan.var_ranges}
+        accepted = False
+        if plan.spec.num_cases is not None:
+            accepted |= self._remove_chunks(lambda cases: cases, lambda cases, items: items, 1)
+
+        for index in range(len(self.cases)):
+            def put_body(cases, body, index=index):
+                if plan.constraint == "permutation":
+                    body = _renumber_body(body)
+                return _replace_case(cases, index, body=body, variables={**cases[index].variables, "n": len(body)})
+
+            def put_columns(cases, columns, index=index):
+                body = [[row[column] for column in columns] for row in cases[index].body]
+                if plan.constraint == "permutation":
+                    body = _renumber_body(body)
+                return _replace_case(cases, index, body=body, variables={**cases[index].variables, "m": len(columns)})
+
+            # Palindromes and bracket sequences lose their shape when characters go
+            shaped = input_type == "string_n" and plan.spec.distribution in SHAPED_STRING_DISTRIBUTIONS
+            if input_type in ("list_nums", "string_n", "matrix") and not shaped:
+                accepted |= self._remove_chunks(lambda cases, index=index: cases[index].body, put_body, max(ranges["n"][0], 0))
+            if input_type == "matrix":
+                accepted |= self._remove_chunks(lambda cases, index=index: list(range(cases[index].variables["m"])),
+                                                put_columns, max(ranges["m"][0], 0))
+            if plan.query_count_range is not None:
+                accepted |= self._remove_chunks(lambda cases, index=index: cases[index].queries,
+                                                lambda cases, queries, index=index: _replace_case(cases, index, queries=queries),
+                                                plan.query_count_range[0])
+
+        for index in range(len(self.cases)):
+            value_lo = plan.value_range[0]
+            if plan.constraint != "none":
+                pass # Lowering values would break distinctness or order; removals above keep them
+            elif input_type == "list_nums":
+                accepted |= self._lower_values(lambda cases, index=index: cases[index].body,
+                                               lambda cases, values, index=index: _replace_case(cases, index, body=values),
+                                               value_lo)
+            elif input_type == "matrix":
+                def put_flat(cases, values, index=index):
+                    m = cases[index].variables["m"]
+                    return _replace_case(cases, index, body=[values[row:row + m] for row in range(0, len(values), m)])
+
+                accepted |= self._lower_values(lambda cases, index=index: [value for row in cases[index].body
+                                                                           for value in row],
+                                               put_flat, value_lo)
+            elif input_type == "string_n" and plan.spec.distribution not in SHAPED_STRING_DISTRIBUTIONS:
+                rank = {char: position for position, char in enumerate(plan.char_pool)}
+                accepted |= self._lower_values(lambda cases, index=index: [rank[char] for char in cases[index].body],
+                                               lambda cases, values, index=index: _replace_case(
+                                                   cases, index, body=[plan.char_pool[value] for value in values]),
+                                               0)
+            if plan.query_count_range is not None:
+                accepted |= self._lower_values(lambda cases, index=index: [value for query in cases[index].queries
+                                                                           for value in query],
+                                               lambda cases, values, index=index: _replace_case(
+                                                   cases, index, queries=list(zip(values[::2], values[1::2]))),
+                                               plan.query_value_range[0])
+            # Variables that no structure is sized by (e.g. k) are values too
+            sized = {"list_nums": ("n",), "string_n": ("n",), "matrix": ("n", "m")}.get(input_type, ())
+            for name, (lo, _) in ranges.items():
+                if name not in sized:
+                    accepted |= self._lower_values(lambda cases, index=index, name=name: [cases[index].variables[name]],
+                                                   lambda cases, values, index=index, name=name: _replace_case(
+                                                       cases, index, variables={**cases[index].variables, name: values[0]}),
+                                                   lo)
+        return accepted
+
+
+# --- Spec files ---
+
+# JSON shape of every spec field; fields whose default is None may also be null
+SPEC_FIELD_KINDS = {
+    "num_cases": "int",
+    "variables": "variables",
+    "input_type": "str",
+    "value_range": "range",
+    "char_set": "str",
+    "custom_chars": "str",
+    "str_len_range": "range",
+    "fixed_var_names": "names",
+    "query_count_range": "range",
+    "query_value_range": "range",
+    "query_template": "str",
+    "backend": "str",
+    "seed": "int",
+    "distribution": "str",
+    "tree_shape": "str",
+    "weighted_edges": "bool",
+    "n_budget": "int",
+    "budget_split": "str",
+    "constraint": "str",
+    "char_weights": "numbers",
+}
+
+_KIND_NAMES = {
+    "int": "a whole number",
+    "str": "a string",
+    "bool": "true or false",
+    "range": "a [min, max] pair of whole numbers",
+    "variables": 'an object like {"n": [1, 10]} or a list of [name, min, max]',
+    "names": "a string or a list of names",
+    "numbers": "a list of numbers",
+}
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _spec_field(key, value):
+    """Checks the JSON shape of one spec field and returns its GenerationSpec value (lists become tuples)."""
+    kind = SPEC_FIELD_KINDS[key]
+    given = value
+    if value is None and GenerationSpec.__dataclass_fields__[key].default is None:
+        return None
+    if kind == "variables":
+        if isinstance(value, dict):
+            # {"n": [1, 10], "m": [1, 5]} -> (("n", 1, 10), ("m", 1, 5))
+            value = [[name] + (bounds if isinstance(bounds, list) else [bounds]) for name, bounds in value.items()]
+        if isinstance(value, (list, tuple)):
+            items = [tuple(item) if isinstance(item, (list, tuple)) else (item,) for item in value]
+            if all(len(item) == 3 and isinstance(item[0], str) and _is_int(item[1]) and _is_int(item[2])
+                   for item in items):
+                return tuple(items)
+    elif kind == "names":
+        if isinstance(value, str):
+            return tuple(value.split())
+        if isinstance(value, (list, tuple)) and all(isinstance(name, str) for name in value):
+            return tuple(value)
+    elif kind == "range":
+        if isinstance(value, (list, tuple)) and len(value) == 2 and all(map(_is_int, value)):
+            return tuple(value)
+    elif kind == "numbers":
+        if isinstance(value, (list, tuple)) and all(_is_int(weight) or isinstance(weight, float) for weight in value):
+            return tuple(value)
+    elif {"int": _is_int(value), "str": isinstance(value, str), "bool": isinstance(value, bool)}[kind]:
+        return value
+    raise SpecError(f"Spec field '{key}' must be {_KIND_NAMES[kind]}, got {json.dumps(given, default=repr)[:80]}.")
+
+
+def spec_from_dict(data):
+    """Builds a GenerationSpec from a JSON-style dict (lists become tuples)."""
+    if not isinstance(data, dict):
+        raise SpecError("Spec must be a JSON object.")
+    known = GenerationSpec.__dataclass_fields__
+    unknown = sorted(set(data) - set(known))
+    if unknown:
+        raise SpecError(f"Unknown spec field(s): {', '.join(unknown)}")
+
+    return GenerationSpec(**{key: _spec_field(key, value) for key, value in data.items()})
+
+
+def spec_to_dict(spec):
+    """The JSON-style dict of a GenerationSpec (the inverse of spec_from_dict)."""
+    data = {}
+    for key in GenerationSpec.__dataclass_fields__:
+        value = getattr(spec, key)
+        if key == "variables":
+            value = {name: [lo, hi] for name, lo, hi in value}
+        elif isinstance(value, tuple):
+            value = list(value)
+        data[key] = value
+    return data
+
+
+def _is_yaml(path):
+    return path.lower().endswith((".yaml", ".yml"))
+
+
+def _import_yaml():
+    try:
+        import yaml # Optional, only needed for .yaml/.yml specs
+    except ImportError:
+        raise SpecError("YAML spec files need PyYAML (pip install pyyaml); JSON specs work without it.")
+    return yaml
+
+
+def load_spec(path):
+    """Reads a JSON or YAML (.yaml/.yml) spec file ('-' reads JSON from stdin) and returns a GenerationSpec."""
+    try:
+        if path == "-":
+            data = json.load(sys.stdin)
+        elif _is_yaml(path):
+            yaml = _import_yaml()
+            with open(path, encoding="utf-8") as f:
+                try:
+                    data = yaml.safe_load(f)
+                except yaml.YAMLError as e:
+                    raise SpecError(f"Spec file {path} is not valid YAML: {e}")
+        else:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+    except json.JSONDecodeError as e:
+        raise SpecError(f"Spec file {path} is not valid JSON: {e}")
+    except UnicodeDecodeError as e:
+        raise SpecError(f"Spec file {path} is not UTF-8 text: {e}")
+    except OSError as e:
+        raise SpecError(f"Cannot read spec file {path}: {e.strerror or e}")
+    return spec_from_dict(data)
+
+
+def save_spec(spec, path):
+    """Writes a spec file that load_spec reads back into the same spec (YAML for .yaml/.yml, else JSON)."""
+    data = spec_to_dict(spec)
+    with open(path, "w", encoding="utf-8") as f:
+        if _is_yaml(path):
+            _import_yaml().safe_dump(data, f, sort_keys=False)
+        else:
+            json.dump(data, f, indent=4)
+            f.write("\n")
+
+
+# --- Test suite export (numbered files, size tiers, manifest) ---
+
+SUITE_COMPRESSION = ("none", "gzip", "zip")
+
+MANIFEST_NAME = "manifest.json"
+SUITE_ARCHIVE = "tests.zip"
+
+# zlib level for .gz files and zip members: close to 9 in size at a fraction of the time
+COMPRESS_LEVEL = 6
+
+# Fixed timestamp of zip members, so that the same suite gives the same archive
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+_TIER = re.compile(r"^\s*(\d+)\s*(?::(.*))?$", re.DOTALL)
+_TIER_SETTING = re.compile(r"^(?:([A-Za-z_]\w*)=)?(\d+(?:[eE]\d+)?)(?:\.\.(\d+(?:[eE]\d+)?))?$")
+
+
+@dataclass
+class SuiteTest:
+    """One file of a test suite."""
+    name: str                            # "01", "02", ... (plus the suffix)
+    spec: GenerationSpec
+    seed: int                            # Master seed of the file, as accepted by `gen --seed`
+
+
+@dataclass
+class SuiteExport:
+    """Outcome of export_suite."""
+    written: int                         # Tests generated in this export
+    skipped: int                         # Tests unchanged since the previous export
+    size: int                            # Bytes of test text in the suite, before compression
+    manifest: str
+
+
+def _schedule_number(text):
+    mantissa, _, exponent = text.lower().partition("e")
+    return int(mantissa) * 10 ** int(exponent or 0)
+
+
+def parse_size_schedule(text):
+    """
+    Parses a size schedule such as "5: n=1..10, 5: n=1000, 10: t=1 n=2e5" into
+    [(count, overrides)]. Each tier is `count` files; NAME=LO[..HI] sets the
+    range of a variable (a bare LO[..HI] means n), q=LO..HI the query count
+    and t=T the number of test cases.
+    """
+    tiers = []
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        match = _TIER.match(part)
+        if not match:
+            raise SpecError(f"Invalid suite tier '{part.strip()}' (expected COUNT or COUNT: n=LO..HI t=T).")
+        overrides = {}
+        for setting in (match.group(2) or "").split():
+            setting_match = _TIER_SETTING.match(setting)
+            if not setting_match:
+                raise SpecError(f"Invalid setting '{setting}' in suite tier '{part.strip()}' (expected NAME=LO..HI).")
+            name, lo, hi = setting_match.groups()
+            lo = _schedule_number(lo)
+            hi = lo if hi is None else _schedule_number(hi)
+            if name == "t":
+                if lo != hi:
+                    raise SpecError("t takes a single number in a suite tier, e.g. t=1.")
+                overrides["num_cases"] = lo
+            elif name == "q":
+                overrides["query_count_range"] = [lo, hi]
+            else:
+                overrides.setdefault("variables", {})[name or "n"] = [lo, hi]
+        tiers.append((int(match.group(1)), overrides))
+    if not tiers:
+        raise SpecError("The size schedule has no tiers.")
+    return tiers
+
+
+def load_schedule(source):
+    """
+    A size schedule from a JSON/YAML file (a list of {"count": k, <spec fields>}
+    tiers, for overrides the short form cannot express) or a parse_size_schedule string.
+    """
+    if not os.path.isfile(source):
+        return parse_size_schedule(source)
+    try:
+        with open(source, encoding="utf-8") as f:
+            if _is_yaml(source):
+                yaml = _import_yaml()
+                try:
+                    data = yaml.safe_load(f)
+                except yaml.YAMLError as e:
+                    raise SpecError(f"Schedule file {source} is not valid YAML: {e}")
+            else:
+                data = json.load(f)
+    except json.JSONDecodeError as e:
+        raise SpecError(f"Schedule file {source} is not valid JSON: {e}")
+    except UnicodeDecodeError as e:
+        raise SpecError(f"Schedule file {source} is not UTF-8 text: {e}")
+    except OSError as e:
+        raise SpecError(f"Cannot read schedule file {source}: {e.strerror or e}")
+    if not isinstance(data, list) or not all(isinstance(tier, dict) and isinstance(tier.get("count"), int)
+                                             for tier in data):
+        raise SpecError("A schedule file must be a list of tiers like {\"count\": 5, \"variables\": {\"n\": [1, 10]}}.")
+    return [(tier["count"], {key: value for key, value in tier.items() if key != "count"}) for tier in data]
+
+
+def suite_tests(spec, schedule, master_seed, suffix=""):
+    """
+    The SuiteTest of every file of `schedule` ([(count, overrides)]), numbered
+    from 01. Tier overrides replace spec fields, except that "variables" are
+    merged into the spec's; every tier spec is validated here, before any output.
+    """
+    base = spec_to_dict(spec)
+    base["seed"] = None # Every file gets its own seed instead
+    width = max(2, len(str(sum(count for count, _ in schedule))))
+    tests = []
+    for count, overrides in schedule:
+        data = dict(base)
+        for key, value in overrides.items():
+            data[key] = dict(base["variables"], **value) if key == "variables" and isinstance(value, dict) else value
+        tier_spec = compile_spec(spec_from_dict(data)).spec
+        for _ in range(count):
+            number = len(tests) + 1
+            tests.append(SuiteTest(f"{number:0{width}d}{suffix}", tier_spec, derive_seed(master_seed, number)))
+    return tests
+
+
+class ChecksumWriter:
+    """Text sink that encodes into a binary stream, counting the bytes and hashing them (SHA-256)."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+
+    def write(self, text):
+        data = text.encode()
+        self.raw.write(data)
+        self.sha256.update(data)
+        self.size += len(data)
+        return len(text)
+
+
+def _export_test_file(spec, seed, path, compress):
+    """
+    Pool task: generates one test into `path` (gzip-compressed for "gzip")
+    through a temporary file, so no half-written test is ever left under the
+    final name. Returns (size, sha256) of the test text.
+    """
+    import gzip
+    temp = path + ".part"
+    with open(temp, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        raw = gzip.GzipFile(filename="", mode="wb", compresslevel=COMPRESS_LEVEL, fileobj=f, mtime=0) \
+            if compress == "gzip" else contextlib.nullcontext(f)
+        with raw as sink:
+            out = ChecksumWriter(sink)
+            write_output(compile_spec(spec), out, seed=seed)
+    os.replace(temp, path)
+    return out.size, out.sha256.hexdigest()
+
+
+def _submit(pool, func, *args):
+    """pool.submit, or a call on this process (as an already finished future) when `pool` is None."""
+    import concurrent.futures
+    if pool is not None:
+        return pool.submit(func, *args)
+    future = concurrent.futures.Future()
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def _suite_key(test, compress):
+    """Fingerprint of everything a test file depends on; equal keys mean the same file."""
+    text = json.dumps({"spec": spec_to_dict(test.spec), "seed": test.seed, "compress": compress}, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def read_manifest(directory):
+    """
+    The manifest of the last export into `directory` as (master seed, entries
+    by test name); (None, {}) when there is none or it is unreadable.
+    """
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+            manifest = json.load(f)
+        return manifest.get("seed"), {entry["name"]: entry for entry in manifest["tests"]}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None, {}
+
+
+def _zip_member(archive, name, source):
+    """Streams the binary file object `source` into a new, deflated member of `archive`."""
+    import zipfile
+    info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    with archive.open(info, "w", force_zip64=True) as member:
+        shutil.copyfileobj(source, member, WRITE_BUFFER_SIZE)
+
+
+def export_suite(tests, directory, jobs=1, compress="none", force=False, cancel_event=None, on_progress=None,
+                 seed=None, start_method=None):
+    """
+    Writes the SuiteTests into `directory` as plain files, .gz files or one
+    tests.zip, plus a manifest.json with every test's spec, seed, size and
+    SHA-256. Tests whose manifest entry is unchanged and whose file is intact
+    are skipped unless `force`. Tests run on `jobs` processes, at most 2 * jobs
+    at a time, and are finished in order; `on_progress(tests_done, size)` is
+    called after each. When the export completes, files of the previous export
+    that are no longer part of the suite are removed. The suite's master
+    `seed` is recorded for later exports (see read_manifest). `start_method`
+    picks how worker processes start (None: the platform default); callers
+    that run threads, like the GUI, pass "spawn" so they are never forked.
+    """
+    import concurrent.futures
+    import multiprocessing
+    import zipfile
+    if compress not in SUITE_COMPRESSION:
+        raise SpecError(f"Unknown compression '{compress}' (expected one of: {', '.join(SUITE_COMPRESSION)}).")
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    _, old_entries = read_manifest(directory)
+    previous = {} if force else old_entries
+    archive_path = os.path.join(directory, SUITE_ARCHIVE)
+    old_archive = archive = None
+    members = {}
+    if compress == "zip":
+        if previous and os.path.exists(archive_path):
+            try:
+                old_archive = zipfile.ZipFile(archive_path)
+                members = {info.filename: info for info in old_archive.infolist()}
+            except zipfile.BadZipFile:
+                pass
+        archive = zipfile.ZipFile(archive_path + ".part", "w", zipfile.ZIP_DEFLATED, compresslevel=COMPRESS_LEVEL)
+
+    def file_name(test):
+        return test.name + ".gz" if compress == "gzip" else test.name
+
+    def zip_part(test):
+        return os.path.join(directory, f".{test.name}.zip-part")
+
+    def unchanged(test, key):
+        entry = previous.get(test.name)
+        if entry is None or entry.get("key") != key:
+            return False
+        if compress == "zip":
+            info = members.get(test.name)
+            return info is not None and info.file_size == entry["size"]
+        path = os.path.join(directory, file_name(test))
+        return os.path.isfile(path) and os.path.getsize(path) == entry["stored_size"]
+
+    entries = []
+    written = skipped = size = 0
+    complete = False
+    pool = None
+    if jobs > 1 and len(tests) > 1:
+        context = multiprocessing.get_context(start_method) if start_method else None
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=jobs, mp_context=context)
+    tests_left = iter(tests)
+    in_flight = collections.deque() # (test, key, future); future is None for a skipped test
+    try:
+        def refill():
+            running = sum(future is not None for _, _, future in in_flight)
+            for test in tests_left:
+                key = _suite_key(test, compress)
+                if unchanged(test, key):
+                    in_flight.append((test, key, None))
+                    continue
+                target = zip_part(test) if archive else os.path.join(directory, file_name(test))
+                in_flight.append((test, key, _submit(pool, _export_test_file, test.spec, test.seed, target,
+                                                     compress)))
+                running += 1
+                if running >= 2 * jobs:
+                    return
+
+        refill()
+        while in_flight:
+            if cancel_event is not None and cancel_event.is_set():
+                for _, _, future in in_flight:
+                    if future is not None:
+                        future.cancel()
+                raise GenerationCancelled(len(entries))
+            test, key, future = in_flight.popleft()
+            if future is None:
+                entry = previous[test.name]
+                if archive is not None:
+                    with old_archive.open(test.name) as source:
+                        _zip_member(archive, test.name, source)
+                skipped += 1
+            else:
+                test_size, digest = future.result()
+                path = os.path.join(directory, file_name(test))
+                if archive is not None:
+                    with open(zip_part(test), "rb") as source:
+                        _zip_member(archive, test.name, source)
+                    os.remove(zip_part(test))
+                    stored_size = archive.getinfo(test.name).compress_size
+                else:
+                    stored_size = os.path.getsize(path)
+                entry = {"name": test.name, "file": SUITE_ARCHIVE if archive else file_name(test), "seed": test.seed,
+                         "size": test_size, "stored_size": stored_size, "sha256": digest, "key": key,
+                         "spec": spec_to_dict(test.spec)}
+                written += 1
+            entries.append(entry)
+            size += entry["size"]
+            if on_progress is not None:
+                on_progress(len(entries), size)
+            refill()
+        complete = True
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if old_archive is not None:
+            old_archive.close()
+        if archive is not None:
+            # A cancelled export keeps the tests finished so far, as does its manifest
+            archive.close()
+            os.replace(archive_path + ".part", archive_path)
+            for test, _, future in in_flight:
+                if future is not None and os.path.exists(zip_part(test)):
+                    os.remove(zip_part(test))
+        temp = manifest_path + ".part"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump({"seed": seed, "compress": compress, "tests": entries}, f, indent=2)
+            f.write("\n")
+        os.replace(temp, manifest_path)
+
+    if complete:
+        kept = {entry["file"] for entry in entries}
+        for entry in old_entries.values():
+            if entry.get("file") not in kept and os.path.basename(entry.get("file", "")) == entry.get("file"):
+                try:
+                    os.remove(os.path.join(directory, entry["file"]))
+                except OSError:
+                    pass
+    return SuiteExport(written, skipped, size, manifest_path)
+
+
+# --- Generation server (warm plans behind a local socket, for fuzzing loops) ---
+
+# Default localhost port of `serve`
+SERVER_PORT = 8765
+
+# Largest request body the server reads
+MAX_REQUEST_BYTES = 1 << 20
+
+# Characters of generated text per HTTP chunk; the server turns to other clients after each one
+SERVER_CHUNK_CHARS = 1 << 16
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class GenerationServer:
+    """
+    Answers "spec, seed, cases i..j" requests over a minimal HTTP/1.1 interface:
+    POST /generate with {"spec": {...} or "spec.json", "seed": S, "cases": [i, j]}
+    streams cases i..j (1-based) of the suite of S as one input, the same text
+    `gen --seed S` writes for them. Plans stay compiled between requests, and
+    connections are kept alive. All clients share one asyncio loop.
+    """
 
+    def __init__(self):
+        self._spec_files = {} # path -> ((mtime_ns, size), spec)
+        self.requests = 0
 
-if __name__ == "__main__":
+    def _spec_file(self, path):
+        """The spec in file `path`, reloaded only after the file changes."""
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            raise SpecError(f"Cannot read spec file {path}: {e.strerror}")
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._spec_files.get(path)
+        if cached is None or cached[0] != key:
+            cached = (key, load_spec(path))
+            self._spec_files[path] = cached
+        return cached[1]
+
+    def resolve_request(self, data):
+        """Validates a decoded request; returns (plan, seed, first, stop) with 0-based cases first..stop-1."""
+        if not isinstance(data, dict):
+            raise SpecError("Request must be a JSON object.")
+        unknown = sorted(set(data) - {"spec", "seed", "cases"})
+        if unknown:
+            raise SpecError(f"Unknown request field(s): {', '.join(unknown)}")
+        spec = data.get("spec")
+        if spec is None:
+            raise SpecError("Request needs a 'spec' (a spec object or the path of a spec file).")
+        plan = compile_spec(self._spec_file(spec) if isinstance(spec, str) else spec_from_dict(spec))
+
+        seed = data.get("seed", plan.spec.seed)
+        if seed is None:
+            seed = new_master_seed()
+        if not isinstance(seed, int) or isinstance(seed, bool):
+            raise SpecError("'seed' must be an integer.")
+        num_cases = plan.spec.num_cases or 1
+        cases = data.get("cases", [1, num_cases])
+        if isinstance(cases, int):
+            cases = [cases, cases]
+        if not (isinstance(cases, list) and len(cases) == 2
+                and all(isinstance(c, int) and not isinstance(c, bool) for c in cases)):
+            raise SpecError("'cases' must be a case number or a [first, last] pair (1-based, inclusive).")
+        first, last = cases
+        if not 1 <= first <= last <= num_cases:
+            raise SpecError(f"Cases {first}..{last} are not within 1..{num_cases}.")
+        return plan, seed, first - 1, last
+
+    def iter_response(self, plan, seed, first, stop):
+        """Yields cases first..stop-1 of the suite of `seed` as one input, in pieces of about SERVER_CHUNK_CHARS."""
+        parts = [f"{stop - first}\n"] if plan.spec.num_cases is not None else []
+        size = 0
+        rng = random.Random()
+        for case_index in range(first, stop):
+            for chunk in plan.iter_seeded_case(rng, seed, case_index):
+                parts.append(chunk)
+                size += len(chunk)
+                if size >= SERVER_CHUNK_CHARS:
+                    yield "".join(parts)
+                    parts = []
+                    size = 0
+        if parts:
+            yield "".join(parts)
+
+    async def handle(self, reader, writer):
+        """Serves the requests of one connection until the client closes it."""
+        import asyncio
+        try:
+            while await self._serve_request(reader, writer):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass # Client went away mid-request or mid-response
+        except Exception:
+            # Generation failed after the 200 header: the chunked body stays unterminated, so the
+            # client sees a truncated response, and the server keeps serving the others
+            import traceback
+            print("serve: request failed mid-response, connection closed", file=sys.stderr)
+            traceback.print_exc()
+        finally:
+            writer.close()
+
+    async def _send_text(self, writer, status, text, keep_alive, headers=()):
+        data = text.encode()
+        lines = [f"HTTP/1.1 {status} {HTTP_REASONS[status]}", "Content-Type: text/plain; charset=utf-8",
+                 f"Content-Length: {len(data)}", *headers]
+        if not keep_alive:
+            lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + data)
+        await writer.drain()
+        return keep_alive
+
+    async def _serve_request(self, reader, writer):
+        """Reads and answers one request; returns whether the connection stays open."""
+        import asyncio
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return False
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            return await self._send_text(writer, 400, "Malformed request line.\n", False)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            return await self._send_text(writer, 400, "Invalid Content-Length.\n", False)
+        if length > MAX_REQUEST_BYTES:
+            return await self._send_text(writer, 413, f"Requests are limited to {format_size(MAX_REQUEST_BYTES)}.\n", False)
+        body = await reader.readexactly(length)
+
+        if target.split("?", 1)[0] != "/generate":
+            return await self._send_text(writer, 404, "Only POST /generate is served.\n", keep_alive)
+        if method != "POST":
+            return await self._send_text(writer, 405, "Use POST /generate.\n", keep_alive, ["Allow: POST"])
+        try:
+            plan, seed, first, stop = self.resolve_request(json.loads(body))
+            pieces = self.iter_response(plan, seed, first, stop)
+            piece = next(pieces, "") # Errors while generating the first piece still get a 400
+        except json.JSONDecodeError as e:
+            return await self._send_text(writer, 400, f"Request is not valid JSON: {e}\n", keep_alive)
+        except SpecError as e:
+            return await self._send_text(writer, 400, f"{e}\n", keep_alive)
+        except (ValueError, TypeError) as e: # A spec value of the wrong shape for the plan
+            return await self._send_text(writer, 400, f"Invalid request: {e}\n", keep_alive)
+
+        self.requests += 1
+        lines = ["HTTP/1.1 200 OK", "Content-Type: text/plain; charset=utf-8", "Transfer-Encoding: chunked",
+                 f"X-Seed: {seed}", f"X-Cases: {first + 1}-{stop}"]
+        if not keep_alive:
+            lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        while piece:
+            data = piece.encode()
+            writer.write(b"%x\r\n%b\r\n" % (len(data), data))
+            await writer.drain()
+            await asyncio.sleep(0) # Let the other clients' responses advance
+            piece = next(pieces, "")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return keep_alive
+
+
+def serve(socket_path=None, host="127.0.0.1", port=SERVER_PORT, on_ready=None):
+    """
+    Runs a GenerationServer until interrupted: on the Unix socket `socket_path`
+    if given, else on host:port. `on_ready(address)` is called once it listens.
+    """
+    import asyncio
+    import stat
+    server = GenerationServer()
+
+    async def run():
+        if socket_path:
+            if not hasattr(asyncio, "start_unix_server"):
+                raise SpecError("Unix sockets are not available on this platform; use --port.")
+            if os.path.exists(socket_path):
+                if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+                    raise SpecError(f"{socket_path} exists and is not a socket.")
+                os.remove(socket_path) # Left behind by a previous server
+            listener = await asyncio.start_unix_server(server.handle, socket_path)
+            address = socket_path
+        else:
+            listener = await asyncio.start_server(server.handle, host, port)
+            address = "http://{}:{}".format(*listener.sockets[0].getsockname()[:2])
+        if on_ready is not None:
+            on_ready(address)
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(run())
+    finally:
+        if socket_path and os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            os.remove(socket_path)
+    return server
+
+
+def __getattr__(name):
+    # Keeps `from test_case_generator import TestCaseGeneratorApp` working without importing tkinter up front
+    if name == "TestCaseGeneratorApp":
+        from test_case_generator_gui import TestCaseGeneratorApp
+        return TestCaseGeneratorApp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# --- Command Line ---
+
+def open_output(path):
+    """Opens a large-buffered text stream for writing ('-' or None means stdout)."""
+    if path in (None, "-"):
+        return open(sys.stdout.fileno(), "w", encoding="utf-8", newline="\n",
+                    buffering=WRITE_BUFFER_SIZE, closefd=False)
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return open(path, "w", encoding="utf-8", newline="\n", buffering=WRITE_BUFFER_SIZE)
+    except OSError as e:
+        raise SpecError(f"Cannot write {path}: {e.strerror or e}")
+
+
+def cmd_gui(args):
+    """Launches the desktop application."""
+    from test_case_generator_gui import TestCaseGeneratorApp
     app = TestCaseGeneratorApp()
     app.mainloop()
+    return 0
+
+
+def _resolve_seed(args, plan):
+    """Master seed from --seed, then the spec; otherwise a fresh one reported on stderr."""
+    seed = args.seed if args.seed is not None else plan.spec.seed
+    if seed is None:
+        seed = new_master_seed()
+        print(f"seed: {seed}", file=sys.stderr) # Rerun with --seed to reproduce
+    return seed
+
+
+@contextlib.contextmanager
+def profile_capture(cprofile_path=None, tracemalloc_path=None, top=30):
+    """
+    Runs the body under cProfile and/or tracemalloc. The cProfile stats are
+    dumped for pstats/snakeviz; the tracemalloc report lists the peak and the
+    `top` allocation sites still alive at the end. Only this process is traced;
+    pool workers stop the tracing they inherit (see _init_pool_worker).
+    """
+    global _active_profiler
+    profiler = None
+    if tracemalloc_path:
+        import tracemalloc
+        tracemalloc.start()
+    if cprofile_path:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        _active_profiler = profiler
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            _active_profiler = None
+            profiler.dump_stats(cprofile_path)
+        if tracemalloc_path:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(tracemalloc_path, "w", encoding="utf-8") as report:
+                report.write(f"traced memory: {format_size(current)} at exit, {format_size(peak)} peak\n\n")
+                for stat in snapshot.statistics("lineno")[:top]:
+                    report.write(f"{stat}\n")
+
+
+def cmd_gen(args):
+    """Generates the output described by a spec file, streaming it to disk or stdout."""
+    timer = StageTimer() if args.profile else None
+    with profile_capture(args.cprofile, args.tracemalloc):
+        with timer.measure("load") if timer else contextlib.nullcontext():
+            spec = load_spec(args.spec)
+        with timer.measure("compile") if timer else contextlib.nullcontext():
+            plan = compile_spec(spec)
+        jobs = args.jobs or os.cpu_count() or 1
+        if args.case is not None and args.seed is None and plan.spec.seed is None:
+            raise SpecError("--case needs the master seed of the suite (--seed or 'seed' in the spec).")
+        seed = _resolve_seed(args, plan)
+        case_text = None
+        if args.case is not None:
+            # One case as a standalone input, regenerated in O(1) from (seed, case) before the
+            # output is opened, so a bad case number leaves no truncated file behind
+            case_text = plan.generate_case_at(seed, args.case - 1)
+        with open_output(args.output) as out:
+            if case_text is not None:
+                if plan.spec.num_cases is not None:
+                    out.write("1\n")
+                out.write(case_text + "\n")
+            elif jobs > 1 and plan.num_tasks() > 1:
+                write_output_parallel(plan, out, seed, jobs, timer=timer)
+            else:
+                write_output(plan, out, seed=seed, timer=timer)
+            if timer is not None:
+                with timer.measure("write"): # What is still buffered
+                    out.flush()
+    if timer is not None:
+        print(timer.report(), file=sys.stderr)
+    return 0
+
+
+def cmd_export(args):
+    """Writes a numbered test suite (one file per test, by size tier) with a manifest."""
+    plan = compile_spec(load_spec(args.spec))
+    if args.seed is None and plan.spec.seed is None:
+        # Keep the seed of the previous export, so that unchanged tests are skipped
+        args.seed = read_manifest(args.dir)[0]
+    seed = _resolve_seed(args, plan)
+    tests = suite_tests(plan.spec, load_schedule(args.schedule), seed, args.suffix)
+    started = time.perf_counter()
+    result = export_suite(tests, args.dir, jobs=args.jobs or os.cpu_count() or 1, compress=args.compress,
+                          force=args.force, seed=seed)
+    print(f"{len(tests)} tests in {args.dir}: {result.written} generated, {result.skipped} unchanged, "
+          f"{format_size(result.size)} in {time.perf_counter() - started:.1f}s (manifest: {result.manifest})",
+          file=sys.stderr)
+    return 0
+
+
+def cmd_serve(args):
+    """Keeps generating cases on request (POST /generate) until interrupted."""
+    def ready(address):
+        print(f"Serving POST /generate on {address} (Ctrl+C stops)", file=sys.stderr)
+    try:
+        serve(args.socket, args.host, args.port, on_ready=ready)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _first_difference(expected, actual):
+    """Describes the first differing output token, for the stress report."""
+    expected_tokens, actual_tokens = expected.split(), actual.split()
+    for position, (want, got) in enumerate(zip(expected_tokens, actual_tokens)):
+        if want != got:
+            return f"token {position + 1}: expected '{want.decode(errors='replace')}', got '{got.decode(errors='replace')}'"
+    return f"expected {len(expected_tokens)} tokens, got {len(actual_tokens)}"
+
+
+def cmd_stress(args):
+    """Runs a reference and a candidate program on generated inputs until their outputs differ."""
+    plan = compile_spec(load_spec(args.spec))
+    ref_argv, sol_argv = parse_command(args.ref), parse_command(args.sol)
+    seed = _resolve_seed(args, plan)
+    jobs = args.jobs or os.cpu_count() or 1
+    stats = {"runs": 0, "ref": [], "sol": []}
+
+    def on_run(run):
+        stats["runs"] += 1
+        stats["ref"].append(run.ref.seconds)
+        stats["sol"].append(run.sol.seconds)
+        if not args.quiet:
+            print(f"#{run.index + 1} seed {run.seed}: ref {run.ref.seconds:.3f}s, sol {run.sol.seconds:.3f}s, "
+                  f"{format_size(len(run.data))} {run.verdict or 'OK'}", flush=True)
+
+    try:
+        failure = stress_test(plan, ref_argv, sol_argv, seed, jobs, args.runs or None, args.time_limit, on_run)
+    except KeyboardInterrupt:
+        failure = None
+        print("Interrupted.", file=sys.stderr)
+    if stats["runs"]:
+        for name in ("ref", "sol"):
+            times = stats[name]
+            print(f"{name}: {stats['runs']} runs, mean {sum(times) / len(times):.3f}s, max {max(times):.3f}s")
+    if failure is None:
+        return 0
+
+    with open(args.output, "wb") as f:
+        f.write(failure.data)
+    print(f"{failure.verdict} on run #{failure.index + 1}; input saved to {args.output} "
+          f"({format_size(len(failure.data))}, reproduce with: gen --seed {failure.seed})")
+    if failure.verdict == "wrong answer":
+        print(_first_difference(failure.ref.output, failure.sol.output))
+    for name, result in (("ref", failure.ref), ("sol", failure.sol)):
+        if result.returncode not in (0, None) and result.errors:
+            print(f"{name} stderr: {result.errors.decode(errors='replace')[-2000:].rstrip()}")
+    return 1
+
+
+def cmd_shrink(args):
+    """Minimizes a failing input while the checker (or a ref/sol disagreement) still fails on it."""
+    plan = compile_spec(load_spec(args.spec))
+    if args.check is not None:
+        check_argv = parse_command(args.check)
+
+        def still_fails(data):
+            return run_program(check_argv, data).returncode != 0
+    elif args.ref is not None and args.sol is not None:
+        ref_argv, sol_argv = parse_command(args.ref), parse_command(args.sol)
+
+        def still_fails(data):
+            # A reference that breaks means the candidate left the valid inputs
+            verdict = stress_verdict(run_program(ref_argv, data), run_program(sol_argv, data))
+            return verdict is not None and not verdict.startswith("reference")
+    else:
+        raise SpecError("Give a --check command, or both --ref and --sol.")
+    try:
+        with open(args.input, encoding="utf-8") as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        raise SpecError(f"Cannot read input file {args.input}: {getattr(e, 'strerror', None) or e}")
+    cases = parse_input(plan, text)
+    original_size = len(format_input(plan, cases))
+
+    def on_improve(cases):
+        text = format_input(plan, cases)
+        with open(args.output, "w", encoding="utf-8", newline="\n") as out:
+            out.write(text)
+        print(f"{format_size(len(text))} after {shrinker.tests_run} tests", flush=True)
+
+    shrinker = Shrinker(plan, still_fails, args.jobs or os.cpu_count() or 1, on_improve)
+    try:
+        cases = shrinker.shrink(cases)
+    except KeyboardInterrupt:
+        print(f"Interrupted; the smallest failing input so far is in {args.output}.", file=sys.stderr)
+        return 1
+    text = format_input(plan, cases)
+    with open(args.output, "w", encoding="utf-8", newline="\n") as out:
+        out.write(text)
+    print(f"Shrunk {format_size(original_size)} to {format_size(len(text))} in {shrinker.tests_run} tests "
+          f"({len(shrinker.memo)} distinct inputs); saved to {args.output}")
+    return 0
+
+
+class CountingSink:
+    """Text sink that only counts characters, so benchmarks exclude disk I/O."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text)
+
+
+def _scaled(value, scale):
+    return max(1, int(value * scale))
+
+
+# Benchmark scenario -> spec at a size scale (1.0 = Codeforces-scale limits)
+BENCH_SCENARIOS = {
+    "list_nums": lambda scale: GenerationSpec(
+        variables=(("n", _scaled(10**6, scale), _scaled(10**6, scale)),), value_range=(1, 10**9)),
+    "list_nums_many": lambda scale: GenerationSpec(
+        num_cases=_scaled(10**4, scale), variables=(("n", 100, 100),), value_range=(1, 10**9)),
+    "string_n": lambda scale: GenerationSpec(
+        variables=(("n", _scaled(10**6, scale), _scaled(10**6, scale)),), input_type="string_n"),
+    "string_single": lambda scale: GenerationSpec(
+        variables=(), input_type="string_single", str_len_range=(_scaled(10**6, scale),) * 2),
+    "string_weighted": lambda scale: GenerationSpec(
+        variables=(("n", _scaled(10**6, scale), _scaled(10**6, scale)),), input_type="string_n",
+        char_weights=tuple(range(1, 27))),
+    "matrix": lambda scale: GenerationSpec(
+        variables=(("n",) + (_scaled(2000, math.sqrt(scale)),) * 2, ("m",) + (_scaled(2000, math.sqrt(scale)),) * 2),
+        input_type="matrix", value_range=(1, 10**9)),
+    "fixed_vars": lambda scale: GenerationSpec(
+        num_cases=_scaled(2 * 10**5, scale), variables=(), input_type="fixed_vars",
+        fixed_var_names=("x", "y", "z"), value_range=(1, 10**9)),
+    "queries": lambda scale: GenerationSpec(
+        variables=(("n", 10**5, 10**5),), input_type="none", query_count_range=(_scaled(10**6, scale),) * 2,
+        query_template="1 {l:1..n} {r:l..n} | 2 {i:1..n} {x}", query_value_range=(1, 10**9)),
+    "tree": lambda scale: GenerationSpec(
+        variables=(("n", _scaled(2 * 10**5, scale), _scaled(2 * 10**5, scale)),), input_type="tree"),
+    "graph": lambda scale: GenerationSpec(
+        variables=(("n", _scaled(2 * 10**5, scale), _scaled(2 * 10**5, scale)),
+                   ("m", _scaled(2 * 10**5, scale), _scaled(2 * 10**5, scale))), input_type="graph"),
+}
+
+# Benchmark backend -> (spec backend, use all cores)
+BENCH_BACKENDS = {
+    "python": ("python", False),
+    "numpy": ("numpy", False),
+    "multiprocess": ("auto", True),
+}
+
+
+def time_generation(plan, repeat=3, jobs=1):
+    """Best-of-`repeat` wall time (seconds) and output size for one full generation."""
+    best = None
+    for attempt in range(repeat):
+        sink = CountingSink()
+        start = time.perf_counter()
+        if jobs > 1:
+            write_output_parallel(plan, sink, attempt, jobs)
+        else:
+            write_output(plan, sink, seed=attempt)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, sink.size
+
+
+def _peak_rss():
+    """Peak resident set size in bytes of this process and of its largest child, or None (no `resource`)."""
+    try:
+        import resource # Unix only
+    except ImportError:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak if sys.platform == "darwin" else peak * 1024 # Linux reports KiB
+
+
+def _bench_measure(spec, jobs, repeat):
+    """Runs in a fresh process, so the peak RSS belongs to this measurement alone."""
+    plan = compile_spec(spec)
+    if plan.use_numpy:
+        np.random # Import NumPy (lazy, see _LazyModule) before the clock starts, not in the first repeat
+    seconds, size = time_generation(plan, repeat, jobs)
+    return {"cases": spec.num_cases or 1, "bytes": size, "seconds": seconds, "peak_rss": _peak_rss()}
+
+
+def run_benchmark(scenario, backend, scale=1.0, repeat=3):
+    """Measures one scenario on one backend in a child process; returns a result dict, or None if not applicable."""
+    import concurrent.futures
+    spec_backend, parallel = BENCH_BACKENDS[backend]
+    if spec_backend == "numpy" and np is None:
+        return None
+    spec = replace(BENCH_SCENARIOS[scenario](scale), backend=spec_backend)
+    jobs = (os.cpu_count() or 1) if parallel else 1
+    if parallel and (jobs == 1 or compile_spec(spec).num_tasks() == 1):
+        return None # Nothing to split across processes
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+        measured = executor.submit(_bench_measure, spec, jobs, repeat).result()
+    return dict(scenario=scenario, backend=backend, jobs=jobs, **measured,
+                cases_per_s=measured["cases"] / measured["seconds"], mb_per_s=measured["bytes"] / measured["seconds"] / 1e6)
+
+
+# Headless start-up budget: a `python -m test_case_generator gen` of a tiny spec,
+# in ms over a bare interpreter start (an eager NumPy import alone costs more)
+STARTUP_BUDGET_MS = 100
+
+# Modules the headless path must not import before it needs them
+DEFERRED_MODULES = ("tkinter", "numpy", "concurrent.futures", "subprocess", "gzip", "zipfile")
+
+
+def measure_startup(runs=20):
+    """
+    Median wall time (ms) of a headless `gen` of a tiny spec in a fresh
+    interpreter, minus that of a bare interpreter, and the DEFERRED_MODULES
+    that such a run imported anyway.
+    """
+    import subprocess
+    import tempfile
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as directory:
+        spec_path = os.path.join(directory, "tiny.json")
+        save_spec(GenerationSpec(seed=1), spec_path)
+        gen = [sys.executable, "-m", "test_case_generator", "gen", "--spec", spec_path, "-o", os.devnull]
+
+        def median_ms(argv):
+            times = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.run(argv, env=env, check=True, stdout=subprocess.DEVNULL)
+                times.append(time.perf_counter() - start)
+            return sorted(times)[len(times) // 2] * 1000
+
+        subprocess.run(gen, env=env, check=True) # Warm the bytecode cache
+        overhead = median_ms(gen) - median_ms([sys.executable, "-c", "pass"])
+        probe = (f"import sys, test_case_generator as t; t.main({gen[3:]!r}); "
+                 f"print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))")
+        imported = subprocess.run([sys.executable, "-c", probe], env=env, check=True,
+                                  stdout=subprocess.PIPE, text=True).stdout.split()
+    return overhead, imported
+
+
+def cmd_bench(args):
+    """Runs the benchmark suite: every structure on every backend, optionally saved as JSON."""
+    if args.startup:
+        overhead, imported = measure_startup()
+        print(f"headless start-up: {overhead:.1f} ms over a bare interpreter (budget {STARTUP_BUDGET_MS} ms)")
+        if imported:
+            print(f"imported too early: {', '.join(imported)}")
+        return 0 if overhead <= STARTUP_BUDGET_MS and not imported else 1
+    scenarios = args.scenarios or list(BENCH_SCENARIOS)
+    backends = args.backends or list(BENCH_BACKENDS)
+    for name in scenarios:
+        if name not in BENCH_SCENARIOS:
+            raise SpecError(f"Unknown benchmark scenario: {name} (expected one of {', '.join(BENCH_SCENARIOS)})")
+    for name in backends:
+        if name not in BENCH_BACKENDS:
+            raise SpecError(f"Unknown benchmark backend: {name} (expected one of {', '.join(BENCH_BACKENDS)})")
+    if np is None and "numpy" in backends:
+        print("NumPy is not installed; the numpy backend is skipped.", file=sys.stderr)
+
+    results = []
+    print(f"{'scenario':<15} {'backend':<13} {'cases':>8} {'size':>10} {'seconds':>8} {'cases/s':>11} {'MB/s':>7} {'peak RSS':>9}")
+    for scenario in scenarios:
+        for backend in backends:
+            result = run_benchmark(scenario, backend, args.scale, args.repeat)
+            if result is None:
+                continue
+            results.append(result)
+            rss = format_size(result["peak_rss"]) if result["peak_rss"] is not None else "n/a"
+            print(f"{scenario:<15} {backend:<13} {result['cases']:>8} {format_size(result['bytes']):>10} "
+                  f"{result['seconds']:>8.3f} {result['cases_per_s']:>11,.0f} {result['mb_per_s']:>7.1f} {rss:>9}", flush=True)
+
+    if args.output:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__ if np is not None else None,
+            "platform": sys.platform,
+            "cpu_count": os.cpu_count(),
+            "scale": args.scale,
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    return 0
+
+
+def build_arg_parser():
+    """Builds the command-line interface."""
+    parser = argparse.ArgumentParser(
+        prog="test_case_generator.py",
+        description="Codeforces test case generator. Run without arguments to open the GUI.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    gui_parser = subparsers.add_parser("gui", help="open the desktop application (default)")
+    gui_parser.set_defaults(func=cmd_gui)
+
+    gen_parser = subparsers.add_parser("gen", help="generate test cases from a spec file without the GUI")
+    gen_parser.add_argument("--spec", required=True, help="JSON spec file ('-' reads stdin)")
+    gen_parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    gen_parser.add_argument("--seed", type=int, help="master seed, overrides the spec's 'seed' (default: random, printed to stderr)")
+    gen_parser.add_argument("--case", type=int, metavar="I",
+                            help="output only test case #I (1-based) of the seeded suite, as a single-case input")
+    gen_parser.add_argument("-j", "--jobs", type=int, default=1,
+                            help="worker processes for independent test cases (0 = all cores, default: 1)")
+    gen_parser.add_argument("--profile", action="store_true",
+                            help="print the time spent per stage (load, compile, generation, format, write) to stderr")
+    gen_parser.add_argument("--cprofile", metavar="FILE", help="write cProfile stats of the run to FILE (view with pstats or snakeviz)")
+    gen_parser.add_argument("--tracemalloc", metavar="FILE", help="write the peak traced memory and the top allocation sites to FILE")
+    gen_parser.set_defaults(func=cmd_gen)
+
+    export_parser = subparsers.add_parser("export", help="write a numbered test suite (01, 02, ...) from a spec and a size schedule")
+    export_parser.add_argument("--spec", required=True, help="JSON spec file ('-' reads stdin)")
+    export_parser.add_argument("--schedule", required=True,
+                               help="size tiers, e.g. '5: n=1..10, 5: n=1000, 10: t=1 n=2e5 q=2e5', or a JSON/YAML tier file")
+    export_parser.add_argument("--dir", default="tests", help="output directory (default: tests)")
+    export_parser.add_argument("--seed", type=int, help="master seed of the suite (default: the previous export's, else random and printed to stderr)")
+    export_parser.add_argument("-j", "--jobs", type=int, default=1, help="tests written in parallel (0 = all cores, default: 1)")
+    export_parser.add_argument("--compress", choices=SUITE_COMPRESSION, default="none",
+                               help="none (default), gzip (one .gz per test) or zip (one tests.zip)")
+    export_parser.add_argument("--suffix", default="", help="file name suffix, e.g. .in (default: none, as in Polygon)")
+    export_parser.add_argument("--force", action="store_true", help="regenerate every test, even if the manifest says it is unchanged")
+    export_parser.set_defaults(func=cmd_export)
+
+    serve_parser = subparsers.add_parser("serve", help="keep specs compiled and serve seeded cases over a local socket (HTTP)")
+    serve_parser.add_argument("--socket", metavar="PATH", help="listen on this Unix socket instead of a TCP port")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="TCP address to listen on (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=SERVER_PORT, help=f"TCP port (default: {SERVER_PORT}, 0 = any free port)")
+    serve_parser.set_defaults(func=cmd_serve)
+
+    stress_parser = subparsers.add_parser("stress", help="run a reference and a candidate program on generated inputs until they disagree")
+    stress_parser.add_argument("--spec", required=True, help="JSON spec file ('-' reads stdin)")
+    stress_parser.add_argument("--ref", required=True, metavar="CMD", help="reference (brute force) command, e.g. './brute'")
+    stress_parser.add_argument("--sol", required=True, metavar="CMD", help="candidate solution command")
+    stress_parser.add_argument("--seed", type=int, help="master seed of the stress session (default: random, printed to stderr)")
+    stress_parser.add_argument("-j", "--jobs", type=int, default=1, help="concurrent runs (0 = all cores, default: 1)")
+    stress_parser.add_argument("-n", "--runs", type=int, default=0, help="stop after this many passing runs (default: 0 = until a failure)")
+    stress_parser.add_argument("--time-limit", type=float, metavar="SECONDS",
+                               help="report the solution as TLE beyond this wall time (both programs are killed at twice the limit)")
+    stress_parser.add_argument("-o", "--output", default="stress_failed.in", help="where to save the failing input (default: stress_failed.in)")
+    stress_parser.add_argument("-q", "--quiet", action="store_true", help="only print the summary, not a line per run")
+    stress_parser.set_defaults(func=cmd_stress)
+
+    shrink_parser = subparsers.add_parser("shrink", help="minimize a failing input while it still fails")
+    shrink_parser.add_argument("--spec", required=True, help="JSON spec file the input was generated from")
+    shrink_parser.add_argument("--input", required=True, help="failing input file, e.g. stress_failed.in")
+    shrink_parser.add_argument("--check", metavar="CMD", help="command that reads an input on stdin and exits nonzero while the bug reproduces")
+    shrink_parser.add_argument("--ref", metavar="CMD", help="reference command; with --sol, an input fails while their outputs differ")
+    shrink_parser.add_argument("--sol", metavar="CMD", help="candidate solution command")
+    shrink_parser.add_argument("-j", "--jobs", type=int, default=1, help="candidates tested in parallel (0 = all cores, default: 1)")
+    shrink_parser.add_argument("-o", "--output", default="shrunk.in", help="where to keep the smallest failing input (default: shrunk.in)")
+    shrink_parser.set_defaults(func=cmd_shrink)
+
+    bench_parser = subparsers.add_parser("bench", help="benchmark every input structure on every backend")
+    bench_parser.add_argument("--scale", type=float, default=1.0,
+                              help="size factor for every scenario (default: 1.0 = n up to 10^6, 2000x2000 matrices)")
+    bench_parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, best is reported (default: 3)")
+    bench_parser.add_argument("--scenarios", nargs="+", metavar="NAME", help=f"subset of: {', '.join(BENCH_SCENARIOS)}")
+    bench_parser.add_argument("--backends", nargs="+", metavar="NAME", help=f"subset of: {', '.join(BENCH_BACKENDS)}")
+    bench_parser.add_argument("-o", "--output", help="also write the results (cases/s, MB/s, peak RSS) to this JSON file")
+    bench_parser.add_argument("--startup", action="store_true",
+                              help=f"instead, check the headless start-up time against its {STARTUP_BUDGET_MS} ms budget (exit code 1 if over)")
+    bench_parser.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    """Entry point: opens the GUI when called without a subcommand."""
+    parser = build_arg_parser()
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    if args.command is None:
+        return cmd_gui(args)
+    try:
+        return args.func(args)
+    except SpecError as e:
+        parser.exit(2, f"{parser.prog}: error: {e}\n")
+    except BrokenPipeError:
+        # Consumer (e.g. `| head`) closed the pipe; stop quietly
+        sys.stderr.close()
+        return 1
+    except OSError as e:
+        # Any other file the command reads or writes (reports, manifests, profiles)
+        parser.exit(2, f"{parser.prog}: error: {e}\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1030 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import tkinter.font as tkfont
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+
+from test_case_generator import (
+    BUDGET_SPLITS, INPUT_TYPES, SUITE_COMPRESSION, TREE_SHAPES,
+    GenerationCancelled, GenerationSpec, LineIndex, SpecError, StageTimer,
+    compile_spec, constraints_for, distributions_for, export_suite, format_size, load_spec,
+    new_master_seed, open_output, parse_size_schedule, read_manifest, save_spec, suite_tests,
+    write_output,
+)
+
+# --- Desktop Application (the engine in test_case_generator never imports this module at startup) ---
+
+class TestCaseGeneratorApp(tk.Tk):
+
+    POLL_INTERVAL_MS = 50     # How often the Tk thread drains the worker's queue
+    PROGRESS_INTERVAL = 0.1   # Seconds between progress messages from the worker
+
+    def __init__(self):
+        super().__init__()
+        self.title("Codeforces Test Case Generator")
+        self.geometry("900x800")
+        self.minsize(750, 650)
+
+        self.style = ttk.Style(self)
+        available_themes = self.style.theme_names()
+        if 'clam' in available_themes:
+            self.style.theme_use('clam')
+        elif 'alt' in available_themes:
+             self.style.theme_use('alt')
+        elif 'vista' in available_themes: # Good for Windows
+             self.style.theme_use('vista')
+        elif 'aqua' in available_themes: # Good for macOS
+             self.style.theme_use('aqua')
+        # Default theme as fallback
+
+        # Define custom colors (adapt these for better themes)
+        self.bg_color = self.style.lookup('TFrame', 'background') # Get theme background
+        self.fg_color = self.style.lookup('TLabel', 'foreground') # Get theme foreground
+        self.accent_color = "#0078D7" # A blue accent color
+        self.accent_fg_color = "#FFFFFF" # White text on accent
+        self.hover_color = "#005A9E" # Darker blue for hover
+        self.pressed_color = "#003C6A" # Even darker for pressed
+        self.disabled_bg_color = "#F0F0F0" # Lighter grey for disabled
+        self.disabled_fg_color = "#A0A0A0" # Grey text for disabled
+        self.status_success_color = "#107C10" # Green for success
+        self.status_warning_color = "#D83B01" # Orange for warning
+        self.status_info_color = self.fg_color # Default text color for info
+
+        # --- Custom Styles ---
+        self.style.configure('TLabelFrame', padding=10, borderwidth=1, relief="groove")
+        self.style.configure('TFrame', background=self.bg_color)
+        self.style.configure('TCheckbutton', padding=5)
+        self.style.configure('TRadiobutton', padding=(0, 5), background=self.bg_color) # Match background
+        self.style.configure('TEntry', padding=5)
+        self.style.configure('TCombobox', padding=5)
+
+        # Custom Button Style (Primary Action)
+        self.style.configure('Accent.TButton',
+                             font=('Segoe UI', 10, 'bold'), # Slightly more modern font if available
+                             padding=(15, 8),
+                             background=self.accent_color,
+                             foreground=self.accent_fg_color,
+                             borderwidth=1,
+                             relief="raised") # Start raised
+        self.style.map('Accent.TButton',
+                       background=[('active', self.pressed_color), # Clicked state
+                                   ('hover', self.hover_color),   # Hover state
+                                   ('disabled', self.disabled_bg_color)],
+                       foreground=[('disabled', self.disabled_fg_color)],
+                       relief=[('pressed', 'sunken'), # Sunken when pressed
+                               ('!pressed', 'raised')]) # Raised otherwise
+
+        # Standard Button Style
+        self.style.configure('Std.TButton',
+                             font=('Segoe UI', 9),
+                             padding=(10, 5),
+                             borderwidth=1,
+                             relief="raised")
+        self.style.map('Std.TButton',
+                        background=[('active', self.style.lookup('TButton', 'selectbackground')),
+                                    ('hover', self.style.lookup('TButton', 'lightcolor'))], # Use theme's hover if possible
+                        relief=[('pressed', 'sunken'),
+                                ('!pressed', 'raised')])
+
+        # --- Main Frame ---
+        main_frame = ttk.Frame(self, padding="15") # Increased padding
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        main_frame.grid_columnconfigure(0, weight=1, minsize=350) # Config column (flexible width)
+        main_frame.grid_columnconfigure(1, weight=2) # Output column (takes more space)
+        main_frame.grid_rowconfigure(0, weight=1)    # Allow row to expand vertically
+        main_frame.grid_rowconfigure(1, weight=0)    # Status bar row (fixed height)
+
+        # --- Configuration Frame (Left Side) with Scrollbar ---
+        config_scroll_frame = ttk.Frame(main_frame, style='Card.TFrame', borderwidth=1, relief="solid") # Use a frame as a container
+        config_scroll_frame.grid(row=0, column=0, sticky="nsew", padx=(0, 10), pady=(0, 5)) # Add padding around it
+        config_scroll_frame.grid_rowconfigure(0, weight=1)
+        config_scroll_frame.grid_columnconfigure(0, weight=1)
+
+        config_canvas = tk.Canvas(config_scroll_frame, borderwidth=0, highlightthickness=0, background=self.bg_color) # Remove canvas border
+        config_canvas.grid(row=0, column=0, sticky="nsew")
+
+        scrollbar = ttk.Scrollbar(config_scroll_frame, orient="vertical", command=config_canvas.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+
+        config_canvas.configure(yscrollcommand=scrollbar.set)
+
+        self.config_frame_content = ttk.Frame(config_canvas, padding="15") # Padding inside the scrollable area
+        self.config_frame_content.bind("<Configure>", lambda e: config_canvas.configure(scrollregion=config_canvas.bbox("all")))
+        config_canvas.create_window((0, 0), window=self.config_frame_content, anchor="nw")
+
+        # --- Configuration Widgets ---
+        current_row = 0 # Use grid layout within config_frame_content for better control
+
+        # --- Test Cases (t) ---
+        t_frame = ttk.LabelFrame(self.config_frame_content, text="Test Cases (t)", padding=10)
+        t_frame.grid(row=current_row, column=0, sticky="ew", pady=(0, 10))
+        t_frame.grid_columnconfigure(1, weight=1) # Allow entry to expand if needed
+        current_row += 1
+
+        self.t_var = tk.BooleanVar()
+        self.t_check = ttk.Checkbutton(t_frame, text="Multiple Test Cases (t)?", variable=self.t_var, command=self.toggle_t_entry)
+        self.t_check.grid(row=0, column=0, sticky="w")
+        self.t_label = ttk.Label(t_frame, text="Number of Cases (t):")
+        self.t_entry = ttk.Entry(t_frame, width=10)
+        self.t_entry.insert(0, "10")
+        # Grid placement handled by toggle_t_entry
+
+        self.toggle_t_entry() # Set initial state
+
+        # Master seed: case i is a pure function of (seed, i), so a suite can be regenerated exactly
+        seed_frame = ttk.Frame(t_frame)
+        seed_frame.grid(row=1, column=0, columnspan=3, sticky="w", pady=(5, 0))
+        ttk.Label(seed_frame, text="Seed (blank = random):").pack(side=tk.LEFT, padx=(0, 2))
+        self.seed_entry = ttk.Entry(seed_frame, width=22)
+        self.seed_entry.pack(side=tk.LEFT)
+
+        # --- Common Variables (n, m, k) ---
+        vars_frame = ttk.LabelFrame(self.config_frame_content, text="Common Variables", padding=10)
+        vars_frame.grid(row=current_row, column=0, sticky="ew", pady=(0, 10))
+        current_row += 1
+
+        self.vars_to_include = {}
+        var_row = 0
+        for var_name in ['n', 'm', 'k']:
+            frame = ttk.Frame(vars_frame) # Use a simple frame for each var line
+            frame.grid(row=var_row, column=0, sticky="ew", pady=3)
+            var_row += 1
+
+            bool_var = tk.BooleanVar(value=(var_name == 'n')) # Default n checked
+            check = ttk.Checkbutton(frame, text=f"Include {var_name}?", variable=bool_var)
+            check.pack(side=tk.LEFT, anchor=tk.W, padx=(0, 15)) # Add padding after checkbox
+
+            min_label = ttk.Label(frame, text=f"{var_name} min:")
+            min_label.pack(side=tk.LEFT)
+            min_entry = ttk.Entry(frame, width=7)
+            min_entry.insert(0, "1")
+            min_entry.pack(side=tk.LEFT, padx=(2, 10)) # Padding between min/max
+
+            max_label = ttk.Label(frame, text="max:")
+            max_label.pack(side=tk.LEFT)
+            max_entry = ttk.Entry(frame, width=7)
+            max_entry.insert(0, "10")
+            max_entry.pack(side=tk.LEFT, padx=2)
+            self.vars_to_include[var_name] = (bool_var, min_entry, max_entry)
+
+        # Global sum-of-n budget across all test cases
+        budget_frame = ttk.Frame(vars_frame)
+        budget_frame.grid(row=var_row, column=0, sticky="ew", pady=3)
+        self.budget_var = tk.BooleanVar()
+        ttk.Checkbutton(budget_frame, text="Sum of n =", variable=self.budget_var).pack(side=tk.LEFT, padx=(0, 2))
+        self.budget_entry = ttk.Entry(budget_frame, width=9)
+        self.budget_entry.insert(0, "200000")
+        self.budget_entry.pack(side=tk.LEFT, padx=(0, 10))
+        self.budget_split_var = tk.StringVar(value="random")
+        ttk.Combobox(budget_frame, textvariable=self.budget_split_var, values=list(BUDGET_SPLITS),
+                     width=9, state="readonly").pack(side=tk.LEFT)
+
+        # --- Input Structure ---
+        structure_frame = ttk.LabelFrame(self.config_frame_content, text="Input Structure per Test Case", padding=10)
+        structure_frame.grid(row=current_row, column=0, sticky="ew", pady=(0, 10))
+        current_row += 1
+
+        self.input_type = tk.StringVar(value="list_nums")
+        for value, text in INPUT_TYPES.items():
+            ttk.Radiobutton(structure_frame, text=text, variable=self.input_type, value=value).pack(anchor=tk.W)
+
+        # --- Constraints for Structures ---
+        constraints_frame = ttk.LabelFrame(self.config_frame_content, text="Structure Constraints", padding=10)
+        constraints_frame.grid(row=current_row, column=0, sticky="ew", pady=(0, 10))
+        current_row += 1
+
+        # Distribution (stress presets for the selected structure)
+        distribution_frame = ttk.Frame(constraints_frame)
+        distribution_frame.pack(fill=tk.X, pady=3)
+        ttk.Label(distribution_frame, text="Distribution:").pack(side=tk.LEFT, padx=(0, 2))
+        self.distribution_var = tk.StringVar(value="uniform")
+        self.distribution_combo = ttk.Combobox(distribution_frame, textvariable=self.distribution_var,
+                                               width=16, state="readonly")
+        self.distribution_combo.pack(side=tk.LEFT)
+
+        # Value constraint (distinct / permutation / sorted), offered per structure like the distributions
+        constraint_frame = ttk.Frame(constraints_frame)
+        constraint_frame.pack(fill=tk.X, pady=3)
+        ttk.Label(constraint_frame, text="Constraint:").pack(side=tk.LEFT, padx=(0, 2))
+        self.constraint_var = tk.StringVar(value="none")
+        self.constraint_combo = ttk.Combobox(constraint_frame, textvariable=self.constraint_var,
+                                             width=16, state="readonly")
+        self.constraint_combo.pack(side=tk.LEFT)
+        self.input_type.trace_add("write", lambda *args: self.update_distribution_choices())
+        self.update_distribution_choices()
+
+        # Value Range (Numbers)
+        num_range_frame = ttk.Frame(constraints_frame)
+        num_range_frame.pack(fill=tk.X, pady=3)
+        ttk.Label(num_range_frame, text="Value Range min:").pack(side=tk.LEFT, padx=(0, 2))
+        self.num_min_entry = ttk.Entry(num_range_frame, width=9)
+        self.num_min_entry.insert(0, "0")
+        self.num_min_entry.pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(num_range_frame, text="max:").pack(side=tk.LEFT, padx=(0, 2))
+        self.num_max_entry = ttk.Entry(num_range_frame, width=9)
+        self.num_max_entry.insert(0, "100")
+        self.num_max_entry.pack(side=tk.LEFT)
+
+        # Character Set (Strings)
+        char_set_frame = ttk.Frame(constraints_frame)
+        char_set_frame.pack(fill=tk.X, pady=3)
+        ttk.Label(char_set_frame, text="Char Set:").pack(side=tk.LEFT, padx=(0, 2))
+        self.char_set_var = tk.StringVar(value="lowercase")
+        char_combo = ttk.Combobox(char_set_frame, textvariable=self.char_set_var,
+                                  values=["lowercase", "uppercase", "digits", "alphanumeric", "custom", "words"],
+                                  width=12, state="readonly")
+        char_combo.pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(char_set_frame, text="Custom:").pack(side=tk.LEFT, padx=(0, 2))
+        self.custom_chars_entry = ttk.Entry(char_set_frame, width=15)
+        self.custom_chars_entry.insert(0, "abc")
+        self.custom_chars_entry.pack(side=tk.LEFT)
+
+        # Character weights (one per character, or per word for "words"; empty = uniform)
+        char_weights_frame = ttk.Frame(constraints_frame)
+        char_weights_frame.pack(fill=tk.X, pady=3)
+        ttk.Label(char_weights_frame, text="Char Weights:").pack(side=tk.LEFT, padx=(0, 2))
+        self.char_weights_entry = ttk.Entry(char_weights_frame, width=30)
+        self.char_weights_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        # String Length (Single String)
+        str_len_frame = ttk.Frame(constraints_frame)
+        str_len_frame.pack(fill=tk.X, pady=3)
+        ttk.Label(str_len_frame, text="Str Len min:").pack(side=tk.LEFT, padx=(0, 2))
+        self.str_len_min_entry = ttk.Entry(str_len_frame, width=7)
+        self.str_len_min_entry.insert(0, "1")
+        self.str_len_min_entry.pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(str_len_frame, text="max:").pack(side=tk.LEFT, padx=(0, 2))
+        self.str_len_max_entry = ttk.Entry(str_len_frame, width=7)
+        self.str_len_max_entry.insert(0, "10")
+        self.str_len_max_entry.pack(side=tk.LEFT)
+
+        # Variable Names (Fixed Vars)
+        fixed_vars_frame = ttk.Frame(constraints_frame)
+        fixed_vars_frame.pack(fill=tk.X, pady=3)
+        ttk.Label(fixed_vars_frame, text="Var Names (space-sep):").pack(side=tk.LEFT, padx=(0, 2))
+        self.fixed_vars_entry = ttk.Entry(fixed_vars_frame, width=25)
+        self.fixed_vars_entry.insert(0, "x y")
+        self.fixed_vars_entry.pack(side=tk.LEFT)
+
+        # Tree Shape / Edge Weights (Trees and Graphs)
+        tree_frame = ttk.Frame(constraints_frame)
+        tree_frame.pack(fill=tk.X, pady=3)
+        ttk.Label(tree_frame, text="Tree Shape:").pack(side=tk.LEFT, padx=(0, 2))
+        self.tree_shape_var = tk.StringVar(value="prufer")
+        ttk.Combobox(tree_frame, textvariable=self.tree_shape_var, values=list(TREE_SHAPES),
+                     width=13, state="readonly").pack(side=tk.LEFT, padx=(0, 10))
+        self.weighted_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(tree_frame, text="Weighted edges (Value Range)",
+                        variable=self.weighted_var).pack(side=tk.LEFT)
+
+        # --- Queries ---
+        query_frame = ttk.LabelFrame(self.config_frame_content, text="Queries (Optional)", padding=10)
+        query_frame.grid(row=current_row, column=0, sticky="ew", pady=(0, 10))
+        current_row += 1
+
+        self.q_var = tk.BooleanVar()
+        self.q_check = ttk.Checkbutton(query_frame, text="Include Q queries after main input?", variable=self.q_var, command=self.toggle_q_entry)
+        self.q_check.pack(anchor=tk.W)
+
+        self.q_details_frame = ttk.Frame(query_frame, padding=(15, 5, 0, 0)) # Indent slightly
+
+        # Q Range
+        q_num_frame = ttk.Frame(self.q_details_frame)
+        q_num_frame.pack(fill=tk.X, pady=3)
+        ttk.Label(q_num_frame, text="Q min:").pack(side=tk.LEFT, padx=(0, 2))
+        self.q_min_entry = ttk.Entry(q_num_frame, width=7)
+        self.q_min_entry.insert(0, "1")
+        self.q_min_entry.pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(q_num_frame, text="max:").pack(side=tk.LEFT, padx=(0, 2))
+        self.q_max_entry = ttk.Entry(q_num_frame, width=7)
+        self.q_max_entry.insert(0, "10")
+        self.q_max_entry.pack(side=tk.LEFT)
+
+        # Query Value Range
+        q_format_frame = ttk.Frame(self.q_details_frame)
+        q_format_frame.pack(fill=tk.X, pady=3)
+        ttk.Label(q_format_frame, text="Query Vals min:").pack(side=tk.LEFT, padx=(0, 2))
+        self.q_val_min_entry = ttk.Entry(q_format_frame, width=9)
+        self.q_val_min_entry.insert(0, "1")
+        self.q_val_min_entry.pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(q_format_frame, text="max:").pack(side=tk.LEFT, padx=(0, 2))
+        self.q_val_max_entry = ttk.Entry(q_format_frame, width=9)
+        self.q_val_max_entry.insert(0, "100")
+        self.q_val_max_entry.pack(side=tk.LEFT)
+
+        # Query Template (typed queries; empty -> two query values per line)
+        q_template_frame = ttk.Frame(self.q_details_frame)
+        q_template_frame.pack(fill=tk.X, pady=3)
+        ttk.Label(q_template_frame, text="Template:").pack(side=tk.LEFT, padx=(0, 2))
+        self.q_template_entry = ttk.Entry(q_template_frame, width=32)
+        self.q_template_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Label(self.q_details_frame, text="e.g. 3: 1 {l:1..n} {r:l..n} | 1: 2 {i:1..n} {x}",
+                  foreground="gray").pack(anchor=tk.W)
+
+        self.toggle_q_entry() # Set initial state
+
+        # --- Test Suite Export ---
+        suite_frame = ttk.LabelFrame(self.config_frame_content, text="Test Suite Export", padding=10)
+        suite_frame.grid(row=current_row, column=0, sticky="ew", pady=(0, 10))
+        current_row += 1
+
+        tiers_frame = ttk.Frame(suite_frame)
+        tiers_frame.pack(fill=tk.X, pady=3)
+        ttk.Label(tiers_frame, text="Files / tiers:").pack(side=tk.LEFT, padx=(0, 2))
+        self.suite_tiers_entry = ttk.Entry(tiers_frame, width=28)
+        self.suite_tiers_entry.insert(0, "10")
+        self.suite_tiers_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Label(suite_frame, text="e.g. 5: n=1..10, 5: n=1000, 10: t=1 n=2e5", foreground="gray").pack(anchor=tk.W)
+
+        compress_frame = ttk.Frame(suite_frame)
+        compress_frame.pack(fill=tk.X, pady=3)
+        ttk.Label(compress_frame, text="Compression:").pack(side=tk.LEFT, padx=(0, 2))
+        self.suite_compress_var = tk.StringVar(value="none")
+        ttk.Combobox(compress_frame, textvariable=self.suite_compress_var, values=SUITE_COMPRESSION,
+                     state="readonly", width=8).pack(side=tk.LEFT)
+
+        # --- Generation Button ---
+        # Place button in its own frame for centering/padding
+        button_frame = ttk.Frame(self.config_frame_content)
+        button_frame.grid(row=current_row, column=0, pady=(20, 10))
+        button_frame.grid_columnconfigure(0, weight=1) # Center button
+        current_row += 1
+
+        self.generate_button = ttk.Button(button_frame, text="Generate Test Cases", command=self.generate_test_cases_async, style='Accent.TButton')
+        self.generate_button.grid(row=0, column=0) # Center in frame
+
+        # Streams straight to disk without touching the output area (for very large outputs)
+        self.generate_file_button = ttk.Button(button_frame, text="Generate to File...", command=self.generate_to_file, style='Std.TButton')
+        self.generate_file_button.grid(row=1, column=0, pady=(10, 0))
+
+        # One numbered file per test, by the tiers of "Test Suite Export"
+        self.export_button = ttk.Button(button_frame, text="Export Suite...", command=self.export_suite_to_folder, style='Std.TButton')
+        self.export_button.grid(row=2, column=0, pady=(10, 0))
+
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel_generation, style='Std.TButton', state=tk.DISABLED)
+        self.cancel_button.grid(row=3, column=0, pady=(10, 0))
+
+        # Spec files keep a configuration across sessions (and feed `gen --spec`)
+        spec_button_frame = ttk.Frame(button_frame)
+        spec_button_frame.grid(row=4, column=0, pady=(10, 0))
+        ttk.Button(spec_button_frame, text="Load Spec...", command=self.load_spec_file, style='Std.TButton').pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(spec_button_frame, text="Save Spec...", command=self.save_spec_file, style='Std.TButton').pack(side=tk.LEFT)
+
+        # --- Output Frame (Right Side) ---
+        output_outer_frame = ttk.Frame(main_frame) # Add an outer frame for padding
+        output_outer_frame.grid(row=0, column=1, sticky="nsew", padx=(10, 0), pady=(0,5))
+        output_outer_frame.grid_rowconfigure(0, weight=1)
+        output_outer_frame.grid_columnconfigure(0, weight=1)
+
+        output_frame = ttk.LabelFrame(output_outer_frame, text="Generated Output", padding=10)
+        output_frame.grid(row=0, column=0, sticky="nsew")
+        output_frame.grid_rowconfigure(0, weight=1)
+        output_frame.grid_columnconfigure(0, weight=1)
+
+        # Text widget with scrollbars
+        text_frame = ttk.Frame(output_frame) # Frame to contain text and scrollbar
+        text_frame.grid(row=0, column=0, sticky="nsew", pady=(0, 5))
+        text_frame.grid_rowconfigure(0, weight=1)
+        text_frame.grid_columnconfigure(0, weight=1)
+
+        # Virtualized view: the text widget only ever holds the visible lines, read from the
+        # generated file through a LineIndex; the vertical scrollbar drives that window
+        self.output_text = tk.Text(text_frame, wrap=tk.NONE, width=60, height=25,
+                                   borderwidth=1, relief="solid", font=("Courier New", 9),
+                                   state=tk.DISABLED,
+                                   background="#fdfdfd") # Slightly off-white background
+        self.output_text.grid(row=0, column=0, sticky="nsew")
+        self.view_linespace = max(1, tkfont.Font(font=self.output_text.cget("font")).metrics("linespace"))
+
+        self.view_scrollbar = ttk.Scrollbar(text_frame, orient="vertical", command=self._on_view_scroll)
+        self.view_scrollbar.grid(row=0, column=1, sticky="ns")
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.output_text.bind(sequence, self._on_view_wheel)
+        self.output_text.bind("<Prior>", lambda e: self._on_view_scroll("scroll", -1, "pages") or "break")
+        self.output_text.bind("<Next>", lambda e: self._on_view_scroll("scroll", 1, "pages") or "break")
+        self.output_text.bind("<Configure>", lambda e: self._render_view())
+
+        text_xscroll = ttk.Scrollbar(output_frame, orient="horizontal", command=self.output_text.xview)
+        text_xscroll.grid(row=1, column=0, sticky="ew")
+        self.output_text['xscrollcommand'] = text_xscroll.set
+
+        # Jump to a test case (start lines recorded during generation) and output size
+        view_bar = ttk.Frame(output_frame)
+        view_bar.grid(row=2, column=0, sticky="ew", pady=(5, 0))
+        ttk.Label(view_bar, text="Go to case #").pack(side=tk.LEFT, padx=(0, 2))
+        self.case_entry = ttk.Entry(view_bar, width=9)
+        self.case_entry.pack(side=tk.LEFT, padx=(0, 5))
+        self.case_entry.bind("<Return>", lambda e: self.jump_to_case())
+        ttk.Button(view_bar, text="Go", command=self.jump_to_case, style='Std.TButton').pack(side=tk.LEFT)
+        self.view_size_label = ttk.Label(view_bar, text="")
+        self.view_size_label.pack(side=tk.RIGHT)
+
+        # Save Button below text area
+        self.save_button = ttk.Button(output_frame, text="Save to File...", command=self.save_to_file, style='Std.TButton')
+        self.save_button.grid(row=3, column=0, pady=(10, 0)) # Add padding above
+
+        # --- Status Bar ---
+        self.status_var = tk.StringVar()
+        status_bar = ttk.Label(main_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W, padding=(5, 2))
+        status_bar.grid(row=1, column=0, columnspan=2, sticky="sew", padx=0, pady=(5,0)) # Span both columns at the bottom
+
+        # --- Event Bindings for Button Animations (Optional but nice) ---
+        # We'll use the built-in ttk states (:hover, :active) configured in the style map
+        # No extra bindings needed for the ttk button animations defined via style.map
+
+        # Full output of the last GUI generation; the output area shows a window of its lines
+        self.generated_path = None
+        self.line_index = None
+        self.case_lines = []
+        self.view_top = 0
+        self.cancel_event = None
+        self.worker_running = False
+        self.worker_suite = None
+        self.backend = "auto" # Not shown in the GUI; kept from loaded spec files
+        self.stage_timer = None
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self.set_status("Ready. Configure and generate test cases.", "info")
+
+
+    # --- Helper Methods ---
+    def set_status(self, message, level="info"):
+        """Updates the status bar with a message and appropriate color."""
+        self.status_var.set(message)
+        status_bar_widget = self.children['!frame'].children['!label'] # Find status bar widget
+        color = self.status_info_color
+        if level == "success":
+            color = self.status_success_color
+        elif level == "warning":
+            color = self.status_warning_color
+        elif level == "error": # Use messagebox for errors, but maybe color status too
+            color = self.status_warning_color # Or a dedicated error color
+        status_bar_widget.config(foreground=color)
+        # Clear status after a delay
+        if level != "info": # Keep 'Ready' message persistent
+            self.after(5000, lambda: self.set_status("Ready.", "info") if self.status_var.get() == message else None)
+
+
+    def on_close(self):
+        """Stops any running generation and removes the temporary output file before closing."""
+        if self.worker_running:
+            self.cancel_event.set()
+            if self.worker_preview:
+                self.generated_path = self.worker_path # Temporary file, remove it below
+        self._discard_generated_file()
+        self.destroy()
+
+
+    def toggle_t_entry(self):
+        """Shows or hides the entry field for the number of test cases using grid."""
+        if self.t_var.get():
+            self.t_label.grid(row=0, column=1, sticky="w", padx=(10, 2))
+            self.t_entry.grid(row=0, column=2, sticky="w")
+        else:
+            self.t_label.grid_forget()
+            self.t_entry.grid_forget()
+
+
+    def update_distribution_choices(self):
+        """Offers the stress distributions and value constraints that apply to the selected input structure."""
+        table = distributions_for(self.input_type.get()) or {"uniform": None}
+        self.distribution_combo.config(values=list(table))
+        if self.distribution_var.get() not in table:
+            self.distribution_var.set("uniform")
+        constraints = constraints_for(self.input_type.get()) or {"none": None}
+        self.constraint_combo.config(values=list(constraints))
+        if self.constraint_var.get() not in constraints:
+            self.constraint_var.set("none")
+
+
+    def toggle_q_entry(self):
+        """Shows or hides the frame containing query configuration options."""
+        if self.q_var.get():
+            self.q_details_frame.pack(fill=tk.X, pady=(5,0), anchor='w') # Ensure it packs correctly
+        else:
+            self.q_details_frame.pack_forget()
+
+    def get_int(self, entry_widget, name):
+        """Reads an integer from an Entry widget, raising SpecError if it is not one."""
+        try:
+            return int(entry_widget.get())
+        except ValueError:
+            raise SpecError(f"Invalid integer value for '{name}'. Please enter a whole number.")
+
+    def get_range(self, min_entry, max_entry, name):
+        """Reads a (min, max) pair from two Entry widgets."""
+        return (self.get_int(min_entry, f"{name}_min"), self.get_int(max_entry, f"{name}_max"))
+
+    def get_weights(self, entry_widget):
+        """Reads space-separated weights from an Entry widget (None if it is empty)."""
+        try:
+            weights = tuple(float(token) if "." in token or "e" in token.lower() else int(token)
+                            for token in entry_widget.get().split())
+        except ValueError:
+            raise SpecError("Character weights must be numbers separated by spaces.")
+        return weights or None
+
+    def build_spec(self):
+        """Reads every configuration widget once and returns a GenerationSpec."""
+        num_cases = None
+        if self.t_var.get():
+            num_cases = self.get_int(self.t_entry, "Number of Test Cases (t)")
+
+        variables = []
+        for var_name in ['n', 'm', 'k']:
+            is_included, min_entry, max_entry = self.vars_to_include[var_name]
+            if is_included.get():
+                variables.append((var_name,) + self.get_range(min_entry, max_entry, var_name))
+
+        query_count_range = None
+        if self.q_var.get():
+            query_count_range = self.get_range(self.q_min_entry, self.q_max_entry, "Number of Queries (Q)")
+
+        n_budget = None
+        if self.budget_var.get():
+            n_budget = self.get_int(self.budget_entry, "Sum of n")
+
+        seed = None
+        if self.seed_entry.get().strip():
+            seed = self.get_int(self.seed_entry, "Seed")
+
+        return GenerationSpec(
+            num_cases=num_cases,
+            variables=tuple(variables),
+            input_type=self.input_type.get(),
+            value_range=self.get_range(self.num_min_entry, self.num_max_entry, "Value Range"),
+            char_set=self.char_set_var.get(),
+            custom_chars=self.custom_chars_entry.get(),
+            str_len_range=self.get_range(self.str_len_min_entry, self.str_len_max_entry, "String Length"),
+            fixed_var_names=tuple(self.fixed_vars_entry.get().split()),
+            query_count_range=query_count_range,
+            query_value_range=self.get_range(self.q_val_min_entry, self.q_val_max_entry, "Query Val"),
+            query_template=self.q_template_entry.get().strip() or None,
+            backend=self.backend,
+            seed=seed,
+            distribution=self.distribution_var.get(),
+            tree_shape=self.tree_shape_var.get(),
+            weighted_edges=self.weighted_var.get(),
+            n_budget=n_budget,
+            budget_split=self.budget_split_var.get(),
+            constraint=self.constraint_var.get(),
+            char_weights=self.get_weights(self.char_weights_entry),
+        )
+
+    @staticmethod
+    def _set_entry(entry, value):
+        entry.delete(0, tk.END)
+        entry.insert(0, str(value))
+
+    def apply_spec(self, spec):
+        """Sets every configuration widget from a GenerationSpec (the inverse of build_spec)."""
+        ranges = {name: (lo, hi) for name, lo, hi in spec.variables}
+        unsupported = [name for name in ranges if name not in self.vars_to_include]
+        if unsupported:
+            raise SpecError(f"The GUI only supports the variables n, m and k (spec has {', '.join(unsupported)}).")
+
+        self.t_var.set(spec.num_cases is not None)
+        if spec.num_cases is not None:
+            self._set_entry(self.t_entry, spec.num_cases)
+        self.toggle_t_entry()
+        self._set_entry(self.seed_entry, "" if spec.seed is None else spec.seed)
+
+        for var_name, (is_included, min_entry, max_entry) in self.vars_to_include.items():
+            is_included.set(var_name in ranges)
+            if var_name in ranges:
+                self._set_entry(min_entry, ranges[var_name][0])
+                self._set_entry(max_entry, ranges[var_name][1])
+        self.budget_var.set(spec.n_budget is not None)
+        if spec.n_budget is not None:
+            self._set_entry(self.budget_entry, spec.n_budget)
+        self.budget_split_var.set(spec.budget_split)
+
+        self.input_type.set(spec.input_type) # Refreshes the distribution and constraint choices
+        self.distribution_var.set(spec.distribution)
+        self.constraint_var.set(spec.constraint)
+        self._set_entry(self.num_min_entry, spec.value_range[0])
+        self._set_entry(self.num_max_entry, spec.value_range[1])
+        self.char_set_var.set(spec.char_set)
+        self._set_entry(self.custom_chars_entry, spec.custom_chars)
+        self._set_entry(self.char_weights_entry, " ".join(map(str, spec.char_weights or ())))
+        self._set_entry(self.str_len_min_entry, spec.str_len_range[0])
+        self._set_entry(self.str_len_max_entry, spec.str_len_range[1])
+        self._set_entry(self.fixed_vars_entry, " ".join(spec.fixed_var_names))
+        self.tree_shape_var.set(spec.tree_shape)
+        self.weighted_var.set(spec.weighted_edges)
+
+        self.q_var.set(spec.query_count_range is not None)
+        if spec.query_count_range is not None:
+            self._set_entry(self.q_min_entry, spec.query_count_range[0])
+            self._set_entry(self.q_max_entry, spec.query_count_range[1])
+        self._set_entry(self.q_val_min_entry, spec.query_value_range[0])
+        self._set_entry(self.q_val_max_entry, spec.query_value_range[1])
+        self._set_entry(self.q_template_entry, spec.query_template or "")
+        self.toggle_q_entry()
+        self.backend = spec.backend
+
+    def load_spec_file(self):
+        """Loads a JSON/YAML spec file into the configuration widgets, compiling it once to validate it."""
+        filepath = filedialog.askopenfilename(
+            filetypes=[("Spec Files", "*.json *.yaml *.yml"), ("All Files", "*.*")],
+            title="Load Spec", parent=self)
+        if not filepath:
+            return
+        try:
+            spec = load_spec(filepath)
+            compile_spec(spec) # Validates now; the cached plan serves the next generation
+            self.apply_spec(spec)
+        except (SpecError, OSError) as e:
+            messagebox.showerror("Spec Error", f"Cannot load {filepath}:\n{e}", parent=self)
+            self.set_status(f"Error loading spec: {e}", "error")
+            return
+        self.set_status(f"Loaded spec from {filepath}.", "success")
+
+    def save_spec_file(self):
+        """Saves the current configuration as a JSON/YAML spec file."""
+        try:
+            spec = self.build_spec()
+        except SpecError as e:
+            messagebox.showerror("Input Error", str(e), parent=self)
+            self.set_status(f"Error: {e}", "error")
+            return
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON Spec", "*.json"), ("YAML Spec", "*.yaml *.yml"), ("All Files", "*.*")],
+            title="Save Spec As", parent=self)
+        if not filepath:
+            self.set_status("Save cancelled.", "info")
+            return
+        try:
+            save_spec(spec, filepath)
+        except (SpecError, OSError) as e:
+            messagebox.showerror("Save Error", f"Failed to save spec:\n{e}", parent=self)
+            self.set_status(f"Error saving spec: {e}", "error")
+            return
+        self.set_status(f"Saved spec to {filepath}.", "success")
+
+    # --- Generation Logic (delegates to the headless engine) ---
+    def _compile_from_widgets(self):
+        """Builds and compiles the spec, reporting problems to the user. Returns None on error."""
+        self.stage_timer = StageTimer() # Shown in the status bar once the generation is done
+        try:
+            with self.stage_timer.measure("read widgets"):
+                spec = self.build_spec()
+            with self.stage_timer.measure("compile"):
+                plan = compile_spec(spec)
+        except SpecError as e:
+            messagebox.showerror("Input Error", str(e), parent=self)
+            self.set_status(f"Error: {e}", "error")
+            return None
+        if plan.spec.num_cases is not None and plan.spec.num_cases > 10000:
+            # Use status bar for warnings
+            self.set_status("Warning: Generating a large number of test cases (> 10000)...", "warning")
+            self.update_idletasks() # Ensure message is shown
+        return plan
+
+    def _discard_generated_file(self):
+        """Deletes the temporary file holding the previous generation, if any."""
+        self._close_view() # Release the file's mmap first (Windows cannot delete mapped files)
+        if self.generated_path:
+            try:
+                os.remove(self.generated_path)
+            except OSError:
+                pass
+            self.generated_path = None
+
+    def _start_worker(self, plan, path, preview, suite=None, seed=None):
+        """
+        Runs generation into `path` on a worker thread; progress is polled with
+        after(). With a list of SuiteTests, `path` is the folder to export them to.
+        """
+        self.cancel_event = threading.Event()
+        self.worker_queue = queue.Queue()
+        self.worker_plan = plan
+        self.worker_path = path
+        self.worker_preview = preview
+        self.worker_suite = suite
+        if seed is None:
+            seed = plan.spec.seed if plan.spec.seed is not None else new_master_seed()
+        self.worker_seed = seed
+        self.worker_started = time.perf_counter()
+        self.worker_running = True
+
+        self.generate_button.config(state=tk.DISABLED, text="Generating...")
+        self.generate_file_button.config(state=tk.DISABLED)
+        self.export_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.set_status("Exporting..." if suite is not None else "Generating...", "info")
+
+        if suite is not None:
+            worker = threading.Thread(target=self._export_worker, daemon=True,
+                                      args=(suite, path, seed, self.suite_compress_var.get(),
+                                            self.cancel_event, self.worker_queue))
+        else:
+            worker = threading.Thread(target=self._generation_worker, daemon=True,
+                                      args=(plan, path, seed, preview,
+                                            self.cancel_event, self.worker_queue, self.stage_timer))
+        worker.start()
+        self.after(self.POLL_INTERVAL_MS, self._poll_worker)
+
+    @staticmethod
+    def _progress_reporter(results):
+        """A worker's on_progress callback: posts ("progress", done, written) at most every PROGRESS_INTERVAL."""
+        last_report = 0.0
+
+        def on_progress(done, written):
+            nonlocal last_report
+            now = time.perf_counter()
+            if now - last_report >= TestCaseGeneratorApp.PROGRESS_INTERVAL:
+                last_report = now
+                results.put(("progress", done, written))
+        return on_progress
+
+    @staticmethod
+    def _generation_worker(plan, path, seed, preview, cancel_event, results, timer):
+        """Worker thread body. Never touches Tk; reports only through the `results` queue."""
+        on_progress = TestCaseGeneratorApp._progress_reporter(results)
+        try:
+            case_lines = [] if preview else None
+            with open_output(path) as out:
+                written = write_output(plan, out, cancel_event=cancel_event, on_progress=on_progress, seed=seed,
+                                       case_lines=case_lines, timer=timer)
+                with timer.measure("write"):
+                    out.flush()
+            # Index the file here too, so the Tk thread only has to show the first page
+            line_index = None
+            if preview:
+                with timer.measure("index"):
+                    line_index = LineIndex(path)
+            results.put(("done", written, line_index, case_lines))
+        except GenerationCancelled as e:
+            results.put(("cancelled", e.args[0]))
+        except Exception as e:
+            results.put(("error", e))
+
+    @staticmethod
+    def _export_worker(suite, directory, seed, compress, cancel_event, results):
+        """Worker thread body of a suite export, on all cores; reports like _generation_worker."""
+        try:
+            # Forking this process (Tk plus worker threads) is unsafe, so the pool spawns fresh interpreters
+            result = export_suite(suite, directory, jobs=os.cpu_count() or 1, compress=compress,
+                                  cancel_event=cancel_event, seed=seed, start_method="spawn",
+                                  on_progress=TestCaseGeneratorApp._progress_reporter(results))
+            results.put(("exported", result))
+        except GenerationCancelled as e:
+            results.put(("cancelled", e.args[0]))
+        except Exception as e:
+            results.put(("error", e))
+
+    def _poll_worker(self):
+        """Drains the worker queue on the Tk thread, showing the latest progress."""
+        progress = None
+        try:
+            while True:
+                message = self.worker_queue.get_nowait()
+                if message[0] != "progress":
+                    self._finish_worker(message)
+                    return
+                progress = message
+        except queue.Empty:
+            pass
+        if progress is not None and not self.cancel_event.is_set():
+            self.set_status(self._progress_text(progress[1], progress[2]), "info")
+        self.after(self.POLL_INTERVAL_MS, self._poll_worker)
+
+    def _progress_text(self, done, written):
+        """Status line for a running generation or export: cases (tests) done, bytes written and ETA."""
+        if self.worker_suite is not None:
+            action, unit, total = "Exporting", "test", len(self.worker_suite)
+        else:
+            action, unit, total = "Generating", "case", self.worker_plan.spec.num_cases or 1
+        elapsed = time.perf_counter() - self.worker_started
+        text = f"{action}... {unit} {min(done + 1, total):,}/{total:,}, {format_size(written)} written"
+        if done:
+            eta = elapsed / done * (total - done)
+            text += f", ETA {eta:.0f}s"
+        return text
+
+    def _finish_worker(self, message):
+        """Handles the worker's final message and re-enables the controls."""
+        kind = message[0]
+        self.worker_running = False
+        self.generate_button.config(state=tk.NORMAL, text="Generate Test Cases")
+        self.generate_file_button.config(state=tk.NORMAL)
+        self.export_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        elapsed = time.perf_counter() - self.worker_started
+
+        if kind == "exported":
+            result = message[1]
+            self.set_status(f"Exported {result.written + result.skipped} tests to {self.worker_path} "
+                            f"({result.written} generated, {result.skipped} unchanged; {format_size(result.size)} "
+                            f"in {elapsed:.1f}s, seed {self.worker_seed}). Good luck!", "success")
+            return
+        if kind == "cancelled" and self.worker_suite is not None:
+            # Finished tests stay, and the manifest lists them, so the next export skips them
+            self.set_status(f"Export cancelled after {message[1]} test(s).", "warning")
+            return
+
+        if kind == "done":
+            written, line_index, case_lines = message[1:]
+            if not self.worker_preview:
+                self.set_status(f"Generated {format_size(written)} into {self.worker_path} in {elapsed:.1f}s "
+                                f"(seed {self.worker_seed}). Good luck! [{self.stage_timer.summary()}]", "success")
+                return
+            self.generated_path = self.worker_path
+            with self.stage_timer.measure("render"):
+                self._show_generated_file(line_index, case_lines)
+                self.update_idletasks() # Include the redraw
+            self.set_status(f"Test cases generated successfully ({format_size(written)} in {elapsed:.1f}s, "
+                            f"seed {self.worker_seed})! Good luck! [{self.stage_timer.summary()}]", "success")
+            return
+
+        # Cancelled or failed: the partial file is useless
+        try:
+            os.remove(self.worker_path)
+        except OSError:
+            pass
+        if kind == "cancelled":
+            self.set_status(f"Generation cancelled during test case #{message[1] + 1}.", "warning")
+        else:
+            error = message[1]
+            messagebox.showerror("Unexpected Error", f"An unexpected error occurred during generation:\n{error}", parent=self)
+            self.set_status(f"Unexpected generation error: {error}", "error")
+
+    # --- Output viewer (virtualized: only the visible lines are in the text widget) ---
+    def _show_generated_file(self, line_index, case_lines):
+        """Shows a generated file from its first line; `case_lines` are the cases' start lines."""
+        self._close_view()
+        self.line_index = line_index
+        self.case_lines = case_lines
+        self.view_top = 0
+        self.view_size_label.config(text=f"{format_size(line_index.size)}, {line_index.line_count:,} lines, "
+                                         f"{len(case_lines):,} case(s)")
+        self._render_view()
+
+    def _close_view(self):
+        if self.line_index is not None:
+            self.line_index.close()
+            self.line_index = None
+        self.case_lines = []
+        self._set_view_text("")
+        self.view_scrollbar.set(0.0, 1.0)
+        self.view_size_label.config(text="")
+
+    def _set_view_text(self, text):
+        self.output_text.config(state=tk.NORMAL)
+        self.output_text.delete('1.0', tk.END)
+        self.output_text.insert('1.0', text)
+        self.output_text.config(state=tk.DISABLED)
+
+    def _view_page_lines(self):
+        """How many lines fit in the output area at its current size."""
+        height = self.output_text.winfo_height()
+        if height <= 1: # Not laid out yet
+            return int(self.output_text.cget("height"))
+        return max(1, height // self.view_linespace)
+
+    def _render_view(self):
+        """Fills the text widget with the lines of the current window and updates the scrollbar."""
+        if self.line_index is None:
+            return
+        page = self._view_page_lines()
+        total = self.line_index.line_count
+        self.view_top = max(0, min(self.view_top, total - page))
+        self._set_view_text("\n".join(self.line_index.lines(self.view_top, page)))
+        self.view_scrollbar.set(self.view_top / max(total, 1), min(1.0, (self.view_top + page) / max(total, 1)))
+
+    def _on_view_scroll(self, action, amount, unit=None):
+        """Scrollbar command ('moveto' fraction, or 'scroll' n units/pages)."""
+        if self.line_index is None:
+            return
+        if action == "moveto":
+            self.view_top = int(float(amount) * self.line_index.line_count)
+        else:
+            step = self._view_page_lines() if unit == "pages" else 1
+            self.view_top += int(amount) * step
+        self._render_view()
+
+    def _on_view_wheel(self, event):
+        direction = -1 if event.num == 4 or event.delta > 0 else 1
+        self._on_view_scroll("scroll", 3 * direction, "units")
+        return "break"
+
+    def jump_to_case(self):
+        """Scrolls the output area to the first line of the test case typed into the case entry."""
+        if self.line_index is None:
+            self.set_status("Generate test cases first, then jump between them.", "warning")
+            return
+        try:
+            case = int(self.case_entry.get())
+        except ValueError:
+            self.set_status("Enter a test case number to jump to.", "warning")
+            return
+        if not 1 <= case <= len(self.case_lines):
+            self.set_status(f"Test case #{case} does not exist (1..{len(self.case_lines):,}).", "warning")
+            return
+        self.view_top = self.case_lines[case - 1]
+        self._render_view()
+        self.set_status(f"Showing test case #{case:,} (line {self.case_lines[case - 1] + 1:,}).", "info")
+
+    def cancel_generation(self):
+        """Asks the running worker to stop; it checks the flag between output chunks."""
+        self.cancel_event.set()
+        self.cancel_button.config(state=tk.DISABLED)
+        self.set_status("Cancelling...", "info")
+
+
+    def generate_test_cases_async(self):
+        """
+        Reads the configuration on the Tk thread, then generates on a worker
+        thread into a temporary file, which the output area shows page by page.
+        """
+        # Read and validate the widgets once; the engine never touches Tk
+        plan = self._compile_from_widgets()
+        if plan is None:
+            return
+        self._discard_generated_file() # Also clears the output area
+        fd, path = tempfile.mkstemp(prefix="testcases_", suffix=".txt")
+        os.close(fd)
+        self._start_worker(plan, path, preview=True)
+
+
+    def _ask_save_path(self, title):
+        """Asks the user where to save output; returns None if cancelled."""
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[("Text Files", "*.txt"), ("Input Files", "*.in"), ("All Files", "*.*")],
+            title=title,
+            parent=self
+        )
+        if not filepath:
+            self.set_status("Save cancelled.", "info")
+            return None
+        return filepath
+
+
+    def generate_to_file(self):
+        """Generates straight into a user-selected file on the worker thread, bypassing the output area."""
+        plan = self._compile_from_widgets()
+        if plan is None:
+            return
+        filepath = self._ask_save_path("Generate Test Cases To")
+        if not filepath:
+            return
+        self._start_worker(plan, filepath, preview=False)
+
+
+    def export_suite_to_folder(self):
+        """Writes one numbered file per test (01, 02, ...) by the suite tiers into a chosen folder, on the worker thread."""
+        plan = self._compile_from_widgets()
+        if plan is None:
+            return
+        try:
+            schedule = parse_size_schedule(self.suite_tiers_entry.get())
+        except SpecError as e:
+            messagebox.showerror("Input Error", str(e), parent=self)
+            self.set_status(f"Error: {e}", "error")
+            return
+        directory = filedialog.askdirectory(title="Export Test Suite To", mustexist=False, parent=self)
+        if not directory:
+            self.set_status("Export cancelled.", "info")
+            return
+        # Without a seed, keep the previous export's, so that unchanged tests are skipped
+        seed = plan.spec.seed if plan.spec.seed is not None else read_manifest(directory)[0]
+        if seed is None:
+            seed = new_master_seed()
+        try:
+            suite = suite_tests(plan.spec, schedule, seed)
+        except SpecError as e:
+            messagebox.showerror("Input Error", str(e), parent=self)
+            self.set_status(f"Error: {e}", "error")
+            return
+        self._start_worker(plan, directory, preview=False, suite=suite, seed=seed)
+
+
+    def save_to_file(self):
+        """Saves the generated output to a user-selected file."""
+        if self.generated_path is None or os.path.getsize(self.generated_path) == 0:
+            # Use status bar instead of messagebox for this warning
+            self.set_status("Warning: Output area is empty. Nothing to save.", "warning")
+            return
+
+        filepath = self._ask_save_path("Save Test Cases As")
+        if not filepath:
+            return
+
+        try:
+            shutil.copyfile(self.generated_path, filepath)
+            # Use status bar for success message
+            self.set_status(f"Successfully saved to {filepath}. Good luck!", "success")
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Failed to save file:\n{e}", parent=self)
+            self.set_status(f"Error saving file: {e}", "error")
+
+
+if __name__ == "__main__":
+    TestCaseGeneratorApp().mainloop()